@@ -0,0 +1,357 @@
+from collections.abc import Sequence
+import numpy as np
+from fjss.gp.dag import ExpressionDAG, apply_function
+from fjss.gp.program import TERMINALS, Node
+from fjss.problem import StaticFJSS, Time
+
+def first_min(scores: np.ndarray) -> np.ndarray:
+    """
+    Index of the minimum of every row, with the tie-breaking and NaN behaviour
+    of min() over the row: the first entry wins unless a later one is strictly
+    smaller
+    """
+    if not np.isnan(scores).any():
+        return scores.argmin(axis=1)
+    best = scores[:, 0].copy()
+    best_index = np.zeros(len(scores), dtype=np.int64)
+    for i in range(1, scores.shape[1]):
+        better = scores[:, i] < best
+        best[better] = scores[better, i]
+        best_index[better] = i
+    return best_index
+
+
+class BatchPrograms:
+    """
+    The GP trees of all lanes as one table of (lane, subexpression) entries,
+    hash-consed so that a subtree repeated within a lane's tree is a single
+    entry. Entries are sorted by height, then function, so evaluation takes
+    one step per tree height, and each step makes one NumPy operation per
+    function present at that height, over all lanes at once.
+    """
+
+    num_lanes: int
+    # per entry: its lane, its node type, the entries of its children (-1 for
+    # terminals) and the index of its terminal in TERMINALS (-1 for functions)
+    lane: np.ndarray
+    node_types: list[str]
+    first: np.ndarray
+    secnd: np.ndarray
+    terminal: np.ndarray
+    # per height: its node types, and the entries of the i-th type, which
+    # range from bounds[i] to bounds[i + 1]
+    levels: list[tuple[list[str], np.ndarray]]
+    roots: np.ndarray
+
+    def __init__(self, roots: Sequence[Node]):
+        dag = ExpressionDAG()
+        root_ids = dag.add_all(roots)
+        height = [0] * len(dag)
+        for id, children in enumerate(dag.children):
+            if len(children) > 0:
+                height[id] = 1 + max(height[child] for child in children)
+
+        keys = sorted(
+            (height[id], dag.node_types[id], lane, id)
+            for lane, root in enumerate(root_ids)
+            for id in dag.reachable([root])
+        )
+        index = {(lane, id): i for i, (_, _, lane, id) in enumerate(keys)}
+        self.num_lanes = len(roots)
+        self.lane = np.array([lane for _, _, lane, _ in keys], dtype=np.int64)
+        self.node_types = [node_type for _, node_type, _, _ in keys]
+        first: list[int] = []
+        secnd: list[int] = []
+        for _, _, lane, id in keys:
+            children = dag.children[id]
+            first.append(index[lane, children[0]] if children else -1)
+            secnd.append(index[lane, children[1]] if children else -1)
+        self.first = np.array(first, dtype=np.int64)
+        self.secnd = np.array(secnd, dtype=np.int64)
+        self.terminal = np.array(
+            [TERMINALS.index(t) if t in TERMINALS else -1 for t in self.node_types],
+            dtype=np.int64,
+        )
+        self.levels = []
+        for i, (h, node_type, _, _) in enumerate(keys):
+            if h == len(self.levels):
+                self.levels.append(([], np.array([i], dtype=np.int64)))
+            node_types, bounds = self.levels[h]
+            if len(node_types) == 0 or node_types[-1] != node_type:
+                node_types.append(node_type)
+                bounds = np.append(bounds, i + 1)
+            else:
+                bounds[-1] = i + 1
+            self.levels[h] = (node_types, bounds)
+        self.roots = np.array(
+            [index[lane, root] for lane, root in enumerate(root_ids)], dtype=np.int64
+        )
+
+    def evaluate(self, lanes: np.ndarray, terminals: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            lanes: The distinct lanes to evaluate, of shape (R,).
+            terminals: Terminal values of shape (len(TERMINALS), R, C), for C
+                       candidates per lane.
+
+        Returns:
+            The value of each lane's program for each candidate, of shape (R, C).
+        """
+        row = np.zeros(self.num_lanes, dtype=np.int64)
+        row[lanes] = np.arange(len(lanes))
+        # the entries of the lanes to evaluate, or None for all of them
+        entries: np.ndarray | None = None
+        if len(lanes) < self.num_lanes:
+            active = np.zeros(self.num_lanes, dtype=bool)
+            active[lanes] = True
+            entries = np.flatnonzero(active[self.lane])
+
+        def select(start: int, end: int) -> slice | np.ndarray:
+            return slice(start, end) if entries is None else entries[start:end]
+
+        values = np.empty((len(self.lane), terminals.shape[2]))
+        for height, (node_types, bounds) in enumerate(self.levels):
+            # the same bounds within the entries to evaluate
+            cuts = (
+                bounds if entries is None else np.searchsorted(entries, bounds)
+            ).tolist()
+            if height == 0:
+                # all terminals are fetched with a single gather
+                selected = select(cuts[0], cuts[-1])
+                values[selected] = terminals[
+                    self.terminal[selected], row[self.lane[selected]]
+                ]
+                continue
+            for i, node_type in enumerate(node_types):
+                selected = select(cuts[i], cuts[i + 1])
+                first = values[self.first[selected]]
+                secnd = values[self.secnd[selected]]
+                values[selected] = apply_function(node_type, first, secnd)
+        return values[self.roots[lanes]]
+
+
+class BatchSimulation:
+    """
+    Run K independent simulations of one static problem in lockstep, lane i
+    being dispatched by routing_rules[i] and sequencing_rules[i].
+
+    Every job has at most one pending event (its arrival, then the completion of
+    its current operation), and every event handles exactly one of them, so all
+    lanes process the same number of events and advance one event per step.
+    Events, machine queues and job progress are NumPy arrays with a leading lane
+    axis, and rules are evaluated for all lanes at once by BatchPrograms.
+
+    The makespans match Simulation with GP rules as built by CCGP.makespan:
+    routing picks the first machine minimizing the rule in get_machines()
+    order, and machine queues behave like DynamicPriorityQueue.
+    """
+
+    problem: StaticFJSS
+    num_lanes: int
+    routing: BatchPrograms
+    sequencing: BatchPrograms
+
+    def __init__(
+        self,
+        problem: StaticFJSS,
+        routing_rules: Sequence[Node],
+        sequencing_rules: Sequence[Node],
+    ):
+        assert len(routing_rules) == len(sequencing_rules)
+        self.problem = problem
+        self.num_lanes = len(routing_rules)
+        self.routing = BatchPrograms(routing_rules)
+        self.sequencing = BatchPrograms(sequencing_rules)
+
+        jobs = problem.jobs
+        num_ops = [len(job.operations) for job in jobs]
+        self.num_ops = np.array(num_ops, dtype=np.int64)
+        self.op_offset = np.concatenate([[0], np.cumsum(self.num_ops)]).astype(
+            np.int64
+        )
+        self.arrival_time = np.array([job.arrival_time for job in jobs], dtype=float)
+
+        ops = [op for job in jobs for op in job.operations]
+        num_candidates = max(len(op.machines) for op in ops)
+        self.processing_time = np.full((len(ops), problem.num_machines), np.nan)
+        self.candidate_machine = np.zeros((len(ops), num_candidates), dtype=np.int64)
+        self.candidate_time = np.full((len(ops), num_candidates), np.inf)
+        self.candidate_valid = np.zeros((len(ops), num_candidates), dtype=bool)
+        for g, op in enumerate(ops):
+            n = len(op.machines)
+            self.processing_time[g, list(op.machines)] = op.times
+            self.candidate_machine[g, :n] = op.machines
+            self.candidate_time[g, :n] = op.times
+            self.candidate_valid[g, :n] = True
+
+        # static terminals of every operation
+        self.npt = np.array(
+            [t for job in jobs for t in job.next_median_work_time], dtype=float
+        )
+        self.wkr = np.array(
+            [t for job in jobs for t in job.median_work_remaining], dtype=float
+        )
+        self.nor = np.array(
+            [n - 1 - i for n in num_ops for i in range(n)], dtype=float
+        )
+
+    def simulate(self) -> list[Time]:
+        K = self.num_lanes
+        J = len(self.problem.jobs)
+        M = self.problem.num_machines
+        lanes = np.arange(K)
+
+        # the pending event of every job, ordered by (time, insertion counter)
+        self.event_time = np.tile(self.arrival_time, (K, 1))
+        self.event_counter = np.tile(np.arange(1, J + 1, dtype=np.int64), (K, 1))
+        self.counter = np.full(K, J, dtype=np.int64)
+        self.job_started = np.zeros((K, J), dtype=bool)
+        self.job_machine = np.zeros((K, J), dtype=np.int64)
+        self.job_op = np.zeros((K, J), dtype=np.int64)
+        self.ready_time = np.zeros((K, J))
+
+        self.now = np.zeros(K)
+        self.busy_until = np.zeros((K, M))
+        self.queue = np.zeros((K, M, J), dtype=np.int64)
+        self.queue_length = np.zeros((K, M), dtype=np.int64)
+
+        for _ in range(J + len(self.npt)):
+            time = self.event_time.min(axis=1)
+            job = np.where(
+                self.event_time == time[:, None],
+                self.event_counter,
+                np.iinfo(np.int64).max,
+            ).argmin(axis=1)
+            self.now = time
+            self.event_time[lanes, job] = np.inf
+
+            finished = self.job_started[lanes, job]
+            self.job_started[lanes, job] = True
+            op_index = self.job_op[lanes, job] + finished
+            route = op_index < self.num_ops[job]
+            self.job_op[lanes[route], job[route]] = op_index[route]
+
+            machine = self.job_machine[lanes, job]
+            self.route(lanes[route], job[route])
+            self.update_queue(lanes[finished], machine[finished])
+
+        return self.now.tolist()
+
+    def route(self, lanes: np.ndarray, job: np.ndarray):
+        if len(lanes) == 0:
+            return
+        now = self.now[lanes]
+        g = self.op_offset[job] + self.job_op[lanes, job]
+        self.ready_time[lanes, job] = now
+
+        machines = self.candidate_machine[g]
+        shape = machines.shape
+        terminals = np.stack(
+            [
+                np.broadcast_to(self.npt[g][:, None], shape),
+                np.broadcast_to(self.wkr[g][:, None], shape),
+                np.broadcast_to(self.nor[g][:, None], shape),
+                np.ones(shape),
+                np.broadcast_to(now[:, None], shape),
+                self.queue_length[lanes[:, None], machines].astype(float),
+                np.maximum(
+                    0.0, now[:, None] - self.busy_until[lanes[:, None], machines]
+                ),
+                self.candidate_time[g],
+                np.broadcast_to((now - self.ready_time[lanes, job])[:, None], shape),
+            ]
+        )
+        scores = self.routing.evaluate(lanes, terminals)
+        scores[~self.candidate_valid[g]] = np.inf
+        machine = machines[np.arange(len(lanes)), first_min(scores)]
+
+        length = self.queue_length[lanes, machine]
+        self.queue[lanes, machine, length] = job
+        self.queue_length[lanes, machine] = length + 1
+        self.update_queue(lanes, machine)
+
+    def update_queue(self, lanes: np.ndarray, machine: np.ndarray):
+        idle = (self.now[lanes] >= self.busy_until[lanes, machine]) & (
+            self.queue_length[lanes, machine] > 0
+        )
+        lanes, machine = lanes[idle], machine[idle]
+        if len(lanes) == 0:
+            return
+        now = self.now[lanes]
+        length = self.queue_length[lanes, machine]
+        items = self.queue[lanes, machine, : length.max()]
+        valid = np.arange(items.shape[1]) < length[:, None]
+        g = self.op_offset[items] + self.job_op[lanes[:, None], items]
+        shape = items.shape
+
+        terminals = np.stack(
+            [
+                self.npt[g],
+                self.wkr[g],
+                self.nor[g],
+                np.ones(shape),
+                np.broadcast_to(now[:, None], shape),
+                np.broadcast_to(length[:, None].astype(float), shape),
+                np.broadcast_to(
+                    np.maximum(0.0, now - self.busy_until[lanes, machine])[:, None],
+                    shape,
+                ),
+                self.processing_time[g, machine[:, None]],
+                now[:, None] - self.ready_time[lanes[:, None], items],
+            ]
+        )
+        scores = self.sequencing.evaluate(lanes, terminals)
+        scores[~valid] = np.inf
+        index = first_min(scores)
+
+        rows = np.arange(len(lanes))
+        job = items[rows, index]
+        # remove the item the way DynamicPriorityQueue does: swap with the last
+        self.queue[lanes, machine, index] = items[rows, length - 1]
+        self.queue_length[lanes, machine] = length - 1
+
+        finish_time = now + self.processing_time[g[rows, index], machine]
+        self.busy_until[lanes, machine] = finish_time
+        self.counter[lanes] += 1
+        self.event_time[lanes, job] = finish_time
+        self.event_counter[lanes, job] = self.counter[lanes]
+        self.job_machine[lanes, job] = machine
+
+
+if __name__ == "__main__":
+    from random import seed
+    from time import perf_counter
+    from fjss.gp.ccgp import CCGP
+    from fjss.problem import DynamicFJSS, StaticFJSSSet
+
+    seed(1)
+    ccgp = CCGP()
+    pop = ccgp.init_population()
+    routing_rules = pop[: len(pop) // 2]
+    sequencing_rules = pop[len(pop) // 2 :][: len(routing_rules)]
+    for problem in StaticFJSSSet("barnes"):
+        assert ccgp.batch_makespan(routing_rules, sequencing_rules, problem) == [
+            ccgp.makespan(routing_rule, sequencing_rule, problem)
+            for routing_rule, sequencing_rule in zip(routing_rules, sequencing_rules)
+        ]
+
+    # wall time against simulating the pairs one by one
+    for num_jobs, num_pairs in [(40, 500), (150, 100)]:
+        problem = DynamicFJSS(10, num_jobs, 0.05).pregenerate(f"dynamic{num_jobs}")
+        routing_rules = pop[:num_pairs]
+        sequencing_rules = pop[-num_pairs:]
+        start = perf_counter()
+        batch = ccgp.batch_makespan(routing_rules, sequencing_rules, problem)
+        batch_seconds = perf_counter() - start
+        start = perf_counter()
+        single = [
+            ccgp.makespan(routing_rule, sequencing_rule, problem)
+            for routing_rule, sequencing_rule in zip(routing_rules, sequencing_rules)
+        ]
+        single_seconds = perf_counter() - start
+        assert batch == single
+        print(
+            f"{num_pairs} pairs, {num_jobs} jobs: batch {batch_seconds:.2f} s, "
+            f"one by one {single_seconds:.2f} s "
+            f"({single_seconds / batch_seconds:.1f}x)"
+        )
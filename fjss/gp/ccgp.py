@@ -1,23 +1,133 @@
 from collections.abc import Callable, Generator, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from statistics import mean
+from time import perf_counter, process_time
+from fjss.gp.batch import BatchSimulation
+from fjss.gp.compiler import compile_routing_rule
 from fjss.gp.gp_context import GPContext
 from fjss.gp.program import Program
+from fjss.instance_store import InstanceRef, InstanceStore, load_instance
 from fjss.problem import FJSS, StaticFJSS, Time
 from fjss.queues.dynamic_priority_queue import DynamicPriorityQueue
+from fjss.queues.tournament_queue import TournamentQueue
+from fjss.queues.queue import Queue
+from fjss.simulate.dispatcher import Dispatcher
 from fjss.simulate.simulation import MachineQueueItem, Simulation
 from random import choice, choices
 from heapq import nsmallest
-from multiprocessing import Pool
+from multiprocessing.pool import Pool
+from typing import override
+
+# terminals whose value for a queued operation does not change while it waits
+QUEUE_INVARIANT_TERMINALS = {"NPT", "WKR", "NOR", "W", "PT"}
+
+
+class EvaluationStats:
+    workers: int
+    started: float
+    evaluations: int
+    busy_time: float
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.started = perf_counter()
+        self.evaluations = 0
+        self.busy_time = 0.0
+
+    def record(self, busy_time: float):
+        self.evaluations += 1
+        self.busy_time += busy_time
+
+    def elapsed(self) -> float:
+        return perf_counter() - self.started
+
+    def evaluations_per_second(self) -> float:
+        return self.evaluations / self.elapsed()
+
+    def cpu_utilization(self) -> float:
+        """
+        Fraction of the worker pool's CPU time spent evaluating individuals
+        """
+        return self.busy_time / (self.elapsed() * self.workers)
+
+    @override
+    def __str__(self) -> str:
+        return (
+            f"{self.evaluations} evaluations, "
+            f"{self.evaluations_per_second():.2f} evaluations/s, "
+            f"{self.cpu_utilization() * 100:.1f}% CPU utilization"
+        )
+
+
+class EvaluationPool:
+    """
+    Worker processes that evaluate rule pairs on a fixed list of problems.
+    The problems are shared with the workers once, through an InstanceStore,
+    and every worker materialises each of them only the first time it is
+    needed, so tasks only carry the rules and an InstanceRef.
+    """
+
+    problems: list[StaticFJSS]
+    parallel: int
+    store: InstanceStore
+    pool: Pool
+
+    def __init__(self, ccgp: "CCGP", problems: list[StaticFJSS], parallel: int):
+        self.problems = problems
+        self.parallel = parallel
+        self.store = InstanceStore.create(problems)
+        self.pool = Pool(
+            parallel,
+            initializer=init_evaluation_worker,
+            initargs=(ccgp, self.store.refs()),
+        )
+
+    def serves(self, problems: list[StaticFJSS], parallel: int) -> bool:
+        return (
+            parallel == self.parallel
+            and len(problems) == len(self.problems)
+            and all(a is b for a, b in zip(problems, self.problems))
+        )
+
+    def normalized_makespan(
+        self, routing_rule: Program, sequencing_rule: Program
+    ) -> float:
+        return mean(
+            self.pool.map(
+                evaluate_on_problem_mp,
+                [(routing_rule, sequencing_rule, ref) for ref in self.store.refs()],
+            )
+        )
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        self.store.close()
 
 
 class CCGP(GPContext):
+    stats: EvaluationStats | None
+    evaluation_pool: EvaluationPool | None
+
     def __init__(self):
         super().__init__()
+        self.stats = None
+        self.evaluation_pool = None
+
+    def __getstate__(self) -> dict[str, object]:
+        # worker processes get a copy of the CCGP, but not its pool
+        state = self.__dict__.copy()
+        state["evaluation_pool"] = None
+        return state
 
     def run_static(
         self, problems: Iterable[StaticFJSS]
     ) -> Generator[tuple[Program, Program], None, None]:
-        yield from self.run(lambda r, s: self.normalized_makespan(r, s, problems))
+        problems = list(problems)
+        try:
+            yield from self.run(lambda r, s: self.normalized_makespan(r, s, problems))
+        finally:
+            self.close_evaluation_pool()
 
     def run(
         self, fitness_fn: Callable[[Program, Program], float]
@@ -26,7 +136,7 @@ class CCGP(GPContext):
         sequencing_pop = self.init_population()
 
         ctx_routing = choice(routing_pop)
-        ctx_sequencing = choice(routing_pop)
+        ctx_sequencing = choice(sequencing_pop)
 
         while True:
             new_routing_pop = self.elitism(routing_pop)
@@ -41,12 +151,113 @@ class CCGP(GPContext):
                 routing_rule.fitness = fitness_fn(routing_rule, ctx_sequencing)
             for sequencing_rule in new_sequencing_pop:
                 sequencing_rule.fitness = fitness_fn(ctx_routing, sequencing_rule)
+            self.migrate(new_routing_pop, new_sequencing_pop)
+            routing_pop = new_routing_pop
+            sequencing_pop = new_sequencing_pop
             ctx_routing = min(new_routing_pop + [ctx_routing], key=lambda p: p.fitness)
             ctx_sequencing = min(
                 new_sequencing_pop + [ctx_sequencing], key=lambda p: p.fitness
             )
             yield ctx_routing, ctx_sequencing
 
+    def run_static_async(
+        self, problems: Iterable[StaticFJSS], parallel: int = 12
+    ) -> Generator[tuple[Program, Program], None, None]:
+        """
+        Steady-state variant of run_static. Offspring are submitted to the worker
+        pool as soon as a worker frees up, tournaments draw from the individuals
+        that have already been evaluated, and the worst individual is replaced
+        once a population is full. The context pair is yielded every time a
+        generation's worth of individuals has been evaluated, and throughput is
+        tracked in self.stats.
+        """
+        problems = list(problems)
+        initial_routing_pop = self.init_population()
+        initial_sequencing_pop = self.init_population()
+        unevaluated = [(p, True) for p in initial_routing_pop] + [
+            (p, False) for p in initial_sequencing_pop
+        ]
+        unevaluated.reverse()
+        generation_size = len(unevaluated)
+
+        routing_pop: list[Program] = []
+        sequencing_pop: list[Program] = []
+        ctx_routing = choice(initial_routing_pop)
+        ctx_sequencing = choice(initial_sequencing_pop)
+        pending: dict[Future[tuple[float, float]], tuple[Program, bool]] = {}
+        next_is_routing = True
+
+        self.stats = EvaluationStats(parallel)
+        store = InstanceStore.create(problems)
+        executor = ProcessPoolExecutor(
+            parallel,
+            initializer=init_evaluation_worker,
+            initargs=(self, store.refs()),
+        )
+        try:
+            while True:
+                # keep every worker busy, with a few tasks queued behind them
+                while len(pending) < 2 * parallel:
+                    if len(unevaluated) > 0:
+                        program, is_routing = unevaluated.pop()
+                    else:
+                        # offspring are bred from evaluated individuals only,
+                        # so wait for the first ones of a population
+                        is_routing = next_is_routing
+                        if len(routing_pop if is_routing else sequencing_pop) == 0:
+                            is_routing = not is_routing
+                        if len(routing_pop if is_routing else sequencing_pop) == 0:
+                            break
+                        next_is_routing = not is_routing
+                        program = self.generate_offspring(
+                            routing_pop if is_routing else sequencing_pop
+                        )
+                    args = (
+                        (program, ctx_sequencing)
+                        if is_routing
+                        else (ctx_routing, program)
+                    )
+                    pending[executor.submit(evaluate_pair_mp, args)] = (
+                        program,
+                        is_routing,
+                    )
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    program, is_routing = pending.pop(future)
+                    program.fitness, busy_time = future.result()
+                    self.stats.record(busy_time)
+
+                    if is_routing:
+                        self.steady_state_insert(
+                            routing_pop, program, len(initial_routing_pop)
+                        )
+                        if program.fitness < ctx_routing.fitness:
+                            ctx_routing = program
+                    else:
+                        self.steady_state_insert(
+                            sequencing_pop, program, len(initial_sequencing_pop)
+                        )
+                        if program.fitness < ctx_sequencing.fitness:
+                            ctx_sequencing = program
+
+                    if self.stats.evaluations % generation_size == 0:
+                        yield ctx_routing, ctx_sequencing
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            store.close()
+
+    def steady_state_insert(self, pop: list[Program], program: Program, size: int):
+        pop.append(program)
+        if len(pop) > size:
+            pop.remove(max(pop, key=lambda p: p.fitness))
+
+    def migrate(self, routing_pop: list[Program], sequencing_pop: list[Program]):
+        """
+        Hook called by run once per generation, after the new populations have
+        been evaluated. Subclasses may exchange individuals in place.
+        """
+
     def generate_offspring(self, pop: list[Program]) -> Program:
         match choices([1, 2, 3], weights=[80, 15, 5], k=1)[0]:
             case 1:
@@ -63,6 +274,11 @@ class CCGP(GPContext):
     def makespan(
         self, routing_rule: Program, sequencing_rule: Program, problem: FJSS
     ) -> Time:
+        return self.make_simulation(routing_rule, sequencing_rule, problem).simulate()
+
+    def make_simulation(
+        self, routing_rule: Program, sequencing_rule: Program, problem: FJSS
+    ) -> Simulation:
         return Simulation(
             problem,
             make_queue=lambda sim, machine: DynamicPriorityQueue[
@@ -72,10 +288,50 @@ class CCGP(GPContext):
                     sim, item.job, item.op_index, machine
                 )
             ),
-            routing_rule=lambda sim, job, op_index: min(
-                job.operations[op_index].get_machines(),
-                key=lambda machine: routing_rule.root.calc(sim, job, op_index, machine),
-            ),
+            routing_rule=compile_routing_rule(routing_rule.root),
+        )
+
+    def make_dispatcher(
+        self, routing_rule: Program, sequencing_rule: Program, num_machines: int
+    ) -> Dispatcher:
+        """
+        An online dispatcher for the rule pair. Sequencing rules that only read
+        queue-invariant terminals get a tournament tree queue, so that starting
+        an operation costs O(log n) instead of evaluating the rule on the whole
+        queue, while still breaking ties exactly as the queues used in training.
+        """
+        root = sequencing_rule.root
+        invariant = all(
+            node.node_type in QUEUE_INVARIANT_TERMINALS
+            for node in root.descendants()
+            if len(node.children) == 0
+        )
+
+        def make_queue(sim: Simulation, machine: int) -> Queue[MachineQueueItem]:
+            def key_fn(item: MachineQueueItem) -> Time:
+                return root.calc(sim, item.job, item.op_index, machine)
+
+            if invariant:
+                return TournamentQueue[MachineQueueItem, Time](key_fn=key_fn)
+            return DynamicPriorityQueue[MachineQueueItem, Time](key_fn=key_fn)
+
+        return Dispatcher(
+            num_machines, make_queue, compile_routing_rule(routing_rule.root)
+        )
+
+    def batch_makespan(
+        self,
+        routing_rules: list[Program],
+        sequencing_rules: list[Program],
+        problem: StaticFJSS,
+    ) -> list[Time]:
+        """
+        Makespans of many rule pairs on one problem, simulated in lockstep
+        """
+        return BatchSimulation(
+            problem,
+            [p.root for p in routing_rules],
+            [p.root for p in sequencing_rules],
         ).simulate()
 
     def normalized_makespan(
@@ -85,20 +341,64 @@ class CCGP(GPContext):
         problems: Iterable[StaticFJSS],
         parallel: int = 12,
     ) -> float:
-        return mean(
-            Pool(parallel).map(
-                normalized_makespan_mp,
-                (
-                    (self, routing_rule, sequencing_rule, problem)
-                    for problem in problems
-                ),
+        problems = list(problems)
+        if parallel <= 1:
+            return mean(
+                normalized_makespan_mp((self, routing_rule, sequencing_rule, problem))
+                for problem in problems
             )
-        )
+        # the pool is kept for later calls with the same problems
+        pool = self.evaluation_pool
+        if pool is None or not pool.serves(problems, parallel):
+            self.close_evaluation_pool()
+            pool = EvaluationPool(self, problems, parallel)
+            self.evaluation_pool = pool
+        return pool.normalized_makespan(routing_rule, sequencing_rule)
+
+    def close_evaluation_pool(self):
+        if self.evaluation_pool is not None:
+            self.evaluation_pool.close()
+            self.evaluation_pool = None
 
     def elitism(self, pop: list[Program], k: int = 2) -> list[Program]:
         return nsmallest(k, pop, key=lambda p: p.fitness)
 
 
+evaluation_worker_context: tuple[CCGP, list[InstanceRef]] | None = None
+
+
+def init_evaluation_worker(ccgp: CCGP, problems: list[InstanceRef]):
+    global evaluation_worker_context
+    evaluation_worker_context = (ccgp, problems)
+
+
+def evaluate_pair_mp(args: tuple[Program, Program]) -> tuple[float, float]:
+    """
+    Evaluate a rule pair on the problems handed to this worker at startup,
+    returning the fitness and the CPU time spent computing it
+    """
+    assert evaluation_worker_context is not None
+    ccgp, problems = evaluation_worker_context
+    routing_rule, sequencing_rule = args
+    start = process_time()
+    fitness = mean(
+        shared_normalized_makespan_mp((ccgp, routing_rule, sequencing_rule, ref))
+        for ref in problems
+    )
+    return fitness, process_time() - start
+
+
+def evaluate_on_problem_mp(args: tuple[Program, Program, InstanceRef]) -> float:
+    """
+    Normalized makespan of a rule pair on one of the problems handed to this
+    worker at startup
+    """
+    assert evaluation_worker_context is not None
+    ccgp, _ = evaluation_worker_context
+    routing_rule, sequencing_rule, ref = args
+    return shared_normalized_makespan_mp((ccgp, routing_rule, sequencing_rule, ref))
+
+
 def makespan_mp(args: tuple[CCGP, Program, Program, FJSS]) -> Time:
     ccgp, routing_rule, sequencing_rule, problem = args
     return ccgp.makespan(routing_rule, sequencing_rule, problem)
@@ -109,3 +409,11 @@ def normalized_makespan_mp(args: tuple[CCGP, Program, Program, StaticFJSS]) -> f
     return ccgp.makespan(routing_rule, sequencing_rule, problem) / (
         problem.lower_bound or float("nan")
     )
+
+
+def shared_normalized_makespan_mp(
+    args: tuple[CCGP, Program, Program, InstanceRef],
+) -> float:
+    ccgp, routing_rule, sequencing_rule, ref = args
+    problem = load_instance(ref)
+    return normalized_makespan_mp((ccgp, routing_rule, sequencing_rule, problem))
@@ -0,0 +1,176 @@
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Protocol
+from fjss.gp.program import Node
+from fjss.problem import Job
+from fjss.simulate.simulation import Simulation
+
+
+class RoutingRule(Protocol):
+    """
+    A compiled routing rule. It chooses among the eligible machines of the
+    operation, or only among candidates if given, which must be a non-empty
+    subset of them.
+    """
+
+    def __call__(
+        self,
+        sim: Simulation,
+        job: Job,
+        op_index: int,
+        candidates: Sequence[int] | None = None,
+        /,
+    ) -> int: ...
+
+
+# terminals whose value differs between the candidate machines of an operation
+MACHINE_TERMINALS = {"PT", "NIQ", "MWT"}
+
+# how each terminal is fetched: once per routing decision, except for the
+# machine terminals, which are fetched once per candidate machine
+TERMINAL_SOURCES = {
+    "NPT": "job.next_median_work_time[op_index]",
+    "WKR": "float(job.median_work_remaining[op_index])",
+    "NOR": "float(len(job.operations) - 1 - op_index)",
+    "W": "1.0",
+    "TIS": "float(now)",
+    "OWT": "now - job.last_operation_ready_time",
+    "PT": "pt",
+    "NIQ": "float(queue_length[machine])",
+    "MWT": "wait if (wait := now - busy_until[machine]) > 0.0 else 0.0",
+}
+
+
+class RoutingCompiler:
+    """
+    Translate a GP tree into the source of a routing rule that scans the
+    candidate machines of an operation in a single loop. Subtrees that do not
+    depend on the machine are hoisted out of the loop, and the arithmetic is
+    inlined so that the loop makes no Python-level calls. Results are
+    identical to taking the minimum of Node.calc over get_machines().
+    """
+
+    prologue: list[str]
+    terminals: set[str]
+    num_temps: int
+
+    def __init__(self):
+        self.prologue = []
+        self.terminals = set()
+        self.num_temps = 0
+
+    def temp(self) -> str:
+        self.num_temps += 1
+        return f"t{self.num_temps}"
+
+    def depends_on_machine(self, node: Node) -> bool:
+        return node.node_type in MACHINE_TERMINALS or any(
+            self.depends_on_machine(child) for child in node.children
+        )
+
+    def hoist(self, node: Node) -> str:
+        """
+        Emit code computing a machine-invariant subtree before the loop
+        """
+        name = self.temp()
+        self.prologue.append(f"{name} = {self.expr(node)}")
+        return name
+
+    def operand(self, node: Node) -> str:
+        if len(node.children) > 0 and not self.depends_on_machine(node):
+            return self.hoist(node)
+        return self.expr(node)
+
+    def expr(self, node: Node) -> str:
+        if len(node.children) == 0:
+            if node.node_type not in TERMINAL_SOURCES:
+                raise ValueError("invalid GP node")
+            self.terminals.add(node.node_type)
+            return node.node_type.lower()
+
+        first = self.operand(node.children[0])
+        secnd = self.operand(node.children[1])
+        match node.node_type:
+            case "ADD":
+                return f"({first} + {secnd})"
+            case "SUB":
+                return f"({first} - {secnd})"
+            case "MUL":
+                return f"({first} * {secnd})"
+            case "DIV":
+                t = self.temp()
+                return (
+                    f"({first} / {t} if ({t} := {secnd}) >= 1e-8 or {t} <= -1e-8"
+                    " else 1.0)"
+                )
+            case "MIN":
+                a, b = self.temp(), self.temp()
+                return f"({b} if ({b} := {secnd}) < ({a} := {first}) else {a})"
+            case "MAX":
+                a, b = self.temp(), self.temp()
+                return f"({b} if ({b} := {secnd}) > ({a} := {first}) else {a})"
+            case _:
+                raise ValueError("invalid GP node")
+
+    def compile(self, node: Node) -> str:
+        if not self.depends_on_machine(node):
+            # every candidate gets the same key, so min() would pick the first one
+            return "\n".join(
+                [
+                    "def route(sim, job, op_index, candidates=None):",
+                    "    if candidates is not None:",
+                    "        return candidates[0]",
+                    "    return job.operations[op_index].machines[0]",
+                ]
+            )
+
+        key = self.expr(node)
+        # terminals are emitted in a fixed order to keep the source deterministic
+        decision_terminals = [
+            f"{terminal.lower()} = {source}"
+            for terminal, source in TERMINAL_SOURCES.items()
+            if terminal in self.terminals and terminal not in MACHINE_TERMINALS
+        ]
+        machine_terminals = [
+            f"{terminal.lower()} = {source}"
+            for terminal, source in TERMINAL_SOURCES.items()
+            if terminal in self.terminals and terminal in MACHINE_TERMINALS - {"PT"}
+        ]
+        lines = [
+            "def route(sim, job, op_index, candidates=None):",
+            "    op = job.operations[op_index]",
+            "    machines, times = op.machines, op.times",
+            "    if candidates is not None:",
+            "        machines = candidates",
+            "        times = [op.times[op.machines.index(m)] for m in candidates]",
+            "    now = sim.now",
+            "    queue_length = sim.state.queue_length",
+            "    busy_until = sim.state.busy_until",
+            *(f"    {line}" for line in decision_terminals),
+            *(f"    {line}" for line in self.prologue),
+            "    best = -1",
+            "    best_key = 0.0",
+            "    for machine, pt in zip(machines, times):",
+            *(f"        {line}" for line in machine_terminals),
+            f"        key = {key}",
+            "        if best < 0 or key < best_key:",
+            "            best = machine",
+            "            best_key = key",
+            "    return best",
+        ]
+        return "\n".join(lines)
+
+
+@lru_cache(maxsize=4096)
+def compile_routing_source(source: str) -> RoutingRule:
+    namespace: dict[str, RoutingRule] = {}
+    exec(source, namespace)
+    return namespace["route"]
+
+
+def compile_routing_rule(node: Node) -> RoutingRule:
+    """
+    Compile a GP tree into a routing rule usable by Simulation, choosing the
+    eligible machine with the smallest value of the tree
+    """
+    return compile_routing_source(RoutingCompiler().compile(node))
@@ -0,0 +1,136 @@
+from collections.abc import Callable, Generator, Sequence
+import numpy as np
+from fjss.gp.program import Node
+
+
+def apply_function(node_type: str, first: np.ndarray, secnd: np.ndarray) -> np.ndarray:
+    """
+    Elementwise counterpart of the internal nodes of Node.calc
+    """
+    with np.errstate(all="ignore"):
+        match node_type:
+            case "ADD":
+                return first + secnd
+            case "SUB":
+                return first - secnd
+            case "MUL":
+                return first * secnd
+            case "DIV":
+                return np.where(
+                    (secnd >= 1e-8) | (secnd <= -1e-8), first / secnd, 1.0
+                )
+            case "MIN":
+                return np.where(secnd < first, secnd, first)
+            case "MAX":
+                return np.where(secnd > first, secnd, first)
+            case _:
+                raise ValueError("invalid GP node")
+
+
+class ExpressionDAG:
+    """
+    Hash-consed GP subtrees: structurally equal subtrees of any of the added
+    programs share a single id. Children always get smaller ids than their
+    parents, so increasing ids are a topological order.
+    """
+
+    node_types: list[str]
+    children: list[tuple[int, ...]]
+    ids: dict[tuple[str, tuple[int, ...]], int]
+
+    def __init__(self):
+        self.node_types = []
+        self.children = []
+        self.ids = {}
+
+    def __len__(self) -> int:
+        return len(self.node_types)
+
+    def add(self, node: Node) -> int:
+        key = (node.node_type, tuple(self.add(child) for child in node.children))
+        id = self.ids.get(key)
+        if id is None:
+            id = len(self.node_types)
+            self.node_types.append(key[0])
+            self.children.append(key[1])
+            self.ids[key] = id
+        return id
+
+    def add_all(self, nodes: Sequence[Node]) -> list[int]:
+        return [self.add(node) for node in nodes]
+
+    def reachable(self, roots: Sequence[int]) -> list[int]:
+        seen = set(roots)
+        stack = list(roots)
+        while len(stack) > 0:
+            for child in self.children[stack.pop()]:
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        return sorted(seen)
+
+    def iter_evaluate(
+        self, roots: Sequence[int], fetch: Callable[[str], np.ndarray]
+    ) -> Generator[tuple[int, np.ndarray], None, None]:
+        """
+        Evaluate the given roots on one set of decision situations, computing
+        every distinct subexpression once. Yields the position in roots and the
+        value of every root as soon as it is computed, and drops each
+        intermediate value once its last parent has used it, so that only the
+        values still needed are held at any time.
+
+        Args:
+            roots: Ids returned by add.
+            fetch: A function returning the values of a terminal for every
+                   candidate. Each terminal is a single node of the DAG, so it
+                   is fetched at most once.
+        """
+        ids = self.reachable(roots)
+        positions: dict[int, list[int]] = {}
+        for i, root in enumerate(roots):
+            positions.setdefault(root, []).append(i)
+        # number of parents, and roots, that still have to read each value
+        uses = {id: len(positions.get(id, ())) for id in ids}
+        for id in ids:
+            for child in self.children[id]:
+                uses[child] += 1
+
+        values: dict[int, np.ndarray] = {}
+        for id in ids:
+            children = self.children[id]
+            if len(children) == 0:
+                value = np.asarray(fetch(self.node_types[id]), dtype=float)
+            else:
+                value = apply_function(
+                    self.node_types[id], values[children[0]], values[children[1]]
+                )
+                for child in children:
+                    uses[child] -= 1
+                    if uses[child] == 0:
+                        del values[child]
+            for i in positions.get(id, ()):
+                uses[id] -= 1
+                yield i, value
+            if uses[id] > 0:
+                values[id] = value
+
+
+if __name__ == "__main__":
+    from fjss.gp.ccgp import CCGP
+
+    ccgp = CCGP()
+    population = ccgp.init_population()
+    for program in population:
+        program.fitness = 1.0
+    offspring = [ccgp.generate_offspring(population) for _ in population]
+    for name, programs in [
+        ("initial population", population),
+        ("with one generation of offspring", population + offspring),
+    ]:
+        dag = ExpressionDAG()
+        dag.add_all([program.root for program in programs])
+        num_nodes = sum(len(program.root.descendants()) for program in programs)
+        print(
+            f"{name}: {num_nodes} tree nodes, {len(dag)} distinct subexpressions "
+            f"({len(dag) / num_nodes:.0%})"
+        )
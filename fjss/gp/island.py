@@ -0,0 +1,223 @@
+from collections.abc import Generator, Iterable
+from heapq import nlargest
+from multiprocessing import Process, Queue
+from queue import Empty
+from typing import override
+from fjss.gp.ccgp import CCGP
+from fjss.gp.program import Program, parse_node
+from fjss.problem import StaticFJSS
+
+# a program travelling between processes: its tree in str(node) form and its fitness
+SerializedProgram = tuple[str, float]
+Topology = list[list[int]]
+
+
+def serialize_program(program: Program) -> SerializedProgram:
+    return str(program.root), program.fitness
+
+
+def deserialize_program(serialized: SerializedProgram) -> Program:
+    tree, fitness = serialized
+    program = Program(parse_node(tree))
+    program.fitness = fitness
+    return program
+
+
+def make_topology(name: str, num_islands: int) -> Topology:
+    """
+    Build the list of migration targets of every island.
+
+    Args:
+        name: "ring" sends migrants to the next island, "full" to every other
+              island and "isolated" disables migration.
+        num_islands: The number of islands.
+    """
+    match name:
+        case "ring":
+            return [[(i + 1) % num_islands] for i in range(num_islands)]
+        case "full":
+            return [
+                [j for j in range(num_islands) if j != i] for i in range(num_islands)
+            ]
+        case "isolated":
+            return [[] for _ in range(num_islands)]
+        case _:
+            raise ValueError(f"invalid topology: {name}")
+
+
+class IslandCCGP(CCGP):
+    index: int
+    inboxes: list["Queue[tuple[list[SerializedProgram], list[SerializedProgram]]]"]
+    targets: list[int]
+    migration_interval: int
+    num_migrants: int
+    generation: int
+
+    def __init__(
+        self,
+        index: int,
+        inboxes: list["Queue[tuple[list[SerializedProgram], list[SerializedProgram]]]"],
+        targets: list[int],
+        migration_interval: int,
+        num_migrants: int,
+    ):
+        super().__init__()
+        self.index = index
+        self.inboxes = inboxes
+        self.targets = targets
+        self.migration_interval = migration_interval
+        self.num_migrants = num_migrants
+        self.generation = 0
+
+    @override
+    def migrate(self, routing_pop: list[Program], sequencing_pop: list[Program]):
+        self.generation += 1
+        if self.generation % self.migration_interval == 0:
+            migrants = (
+                [
+                    serialize_program(p)
+                    for p in self.elitism(routing_pop, self.num_migrants)
+                ],
+                [
+                    serialize_program(p)
+                    for p in self.elitism(sequencing_pop, self.num_migrants)
+                ],
+            )
+            for target in self.targets:
+                self.inboxes[target].put(migrants)
+
+        inbox = self.inboxes[self.index]
+        while True:
+            try:
+                routing_migrants, sequencing_migrants = inbox.get_nowait()
+            except Empty:
+                break
+            self.replace_worst(routing_pop, routing_migrants)
+            self.replace_worst(sequencing_pop, sequencing_migrants)
+
+    def replace_worst(self, pop: list[Program], migrants: list[SerializedProgram]):
+        worst = nlargest(len(migrants), range(len(pop)), key=lambda i: pop[i].fitness)
+        for i, migrant in zip(worst, migrants):
+            pop[i] = deserialize_program(migrant)
+
+
+# (island index, generation, routing rule, sequencing rule, fitness of the pair)
+IslandReport = tuple[int, int, SerializedProgram, SerializedProgram, float]
+
+
+def run_island(
+    island: IslandCCGP, problems: list[StaticFJSS], reports: "Queue[IslandReport]"
+):
+    def fitness_fn(routing_rule: Program, sequencing_rule: Program) -> float:
+        return island.normalized_makespan(
+            routing_rule, sequencing_rule, problems, parallel=1
+        )
+
+    for generation, (routing_rule, sequencing_rule) in enumerate(
+        island.run(fitness_fn), 1
+    ):
+        reports.put(
+            (
+                island.index,
+                generation,
+                serialize_program(routing_rule),
+                serialize_program(sequencing_rule),
+                fitness_fn(routing_rule, sequencing_rule),
+            )
+        )
+
+
+class IslandModel:
+    num_islands: int
+    topology: Topology
+    migration_interval: int
+    num_migrants: int
+    pop_size: int
+    max_depth: int
+    best: tuple[Program, Program, float] | None
+
+    def __init__(
+        self,
+        num_islands: int = 4,
+        topology: str | Topology = "ring",
+        migration_interval: int = 5,
+        num_migrants: int = 2,
+        pop_size: int = 512,
+        max_depth: int = 8,
+    ):
+        """
+        Run several independent CCGP subpopulations in separate processes,
+        migrating elite programs between them.
+
+        Args:
+            num_islands: The number of island processes.
+            topology: A topology name accepted by make_topology, or the list of
+                      migration targets of every island.
+            migration_interval: The number of generations between migrations.
+            num_migrants: The number of elites of each population sent per
+                          migration.
+            pop_size, max_depth: Forwarded to the CCGP of every island.
+        """
+        self.num_islands = num_islands
+        self.topology = (
+            make_topology(topology, num_islands)
+            if isinstance(topology, str)
+            else topology
+        )
+        assert len(self.topology) == num_islands
+        self.migration_interval = migration_interval
+        self.num_migrants = num_migrants
+        self.pop_size = pop_size
+        self.max_depth = max_depth
+        self.best = None
+
+    def run_static(
+        self, problems: Iterable[StaticFJSS]
+    ) -> Generator[tuple[Program, Program], None, None]:
+        """
+        Yield the best rule pair found across all islands so far, once every
+        island has finished a generation. The pair's fitness is kept in self.best.
+        """
+        problems = list(problems)
+        inboxes: list[
+            Queue[tuple[list[SerializedProgram], list[SerializedProgram]]]
+        ] = [Queue() for _ in range(self.num_islands)]
+        reports: Queue[IslandReport] = Queue()
+        processes: list[Process] = []
+        for i in range(self.num_islands):
+            island = IslandCCGP(
+                i, inboxes, self.topology[i], self.migration_interval, self.num_migrants
+            )
+            island.pop_size = self.pop_size
+            island.max_depth = self.max_depth
+            processes.append(
+                Process(target=run_island, args=(island, problems, reports), daemon=True)
+            )
+
+        try:
+            for process in processes:
+                process.start()
+
+            pending: dict[int, list[IslandReport]] = {}
+            generation = 1
+            while True:
+                report = reports.get()
+                pending.setdefault(report[1], []).append(report)
+                while len(pending.get(generation, [])) == self.num_islands:
+                    for _, _, routing_rule, sequencing_rule, fitness in pending.pop(
+                        generation
+                    ):
+                        if self.best is None or fitness < self.best[2]:
+                            self.best = (
+                                deserialize_program(routing_rule),
+                                deserialize_program(sequencing_rule),
+                                fitness,
+                            )
+                    assert self.best is not None
+                    yield self.best[0], self.best[1]
+                    generation += 1
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
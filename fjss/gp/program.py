@@ -1,11 +1,18 @@
 from collections.abc import Callable
 from random import choice, random
+import re
 from typing import override
 from fjss.problem import Job
 from fjss.simulate.simulation import Simulation
 
 
+TERMINALS = ("NPT", "WKR", "NOR", "W", "TIS", "NIQ", "MWT", "PT", "OWT")
+FUNCTIONS = ("ADD", "SUB", "MUL", "DIV", "MIN", "MAX")
+
+
 class Node:
+    __slots__ = ("node_type", "children")
+
     node_type: str
     children: list["Node"]
 
@@ -25,11 +32,7 @@ class Node:
         match self.node_type:
             # terminals
             case "NPT":
-                return (
-                    float(job.median_work_time[op_index + 1])
-                    if op_index + 1 < len(job.operations)
-                    else 0.0
-                )
+                return job.next_median_work_time[op_index]
             case "WKR":
                 return float(job.median_work_remaining[op_index])
             case "NOR":
@@ -39,7 +42,7 @@ class Node:
             case "TIS":
                 return float(sim.now)
             case "NIQ":
-                return float(len(sim.machine_queues[machine]))
+                return float(sim.state.queue_length[machine])
             case "MWT":
                 return max(0.0, sim.now - sim.machines_busy_until[machine])
             case "PT":
@@ -94,17 +97,47 @@ class Node:
         )
 
 
+TERMINAL_NODES = [Node(terminal, []) for terminal in TERMINALS]
+
+
+def terminal_values(
+    sim: Simulation, job: Job, op_index: int, machine: int
+) -> list[float]:
+    """
+    Values of all terminals, in TERMINALS order, for one decision candidate
+    """
+    return [node.calc(sim, job, op_index, machine) for node in TERMINAL_NODES]
+
+
+def parse_node(s: str) -> Node:
+    """
+    Parse a tree from the compact form produced by str(node),
+    e.g. ADD(PT,MUL(NIQ,WKR))
+    """
+    tokens = re.findall(r"[A-Z]+|[(),]", s)
+    tokens.reverse()
+
+    def parse() -> Node:
+        node = Node(tokens.pop(), [])
+        if len(tokens) > 0 and tokens[-1] == "(":
+            tokens.pop()
+            node.children.append(parse())
+            while tokens.pop() == ",":
+                node.children.append(parse())
+        return node
+
+    node = parse()
+    if len(tokens) > 0:
+        raise ValueError(f"trailing tokens in GP tree: {s}")
+    return node
+
+
 def random_terminal():
-    return Node(
-        choice(["NPT", "WKR", "NOR", "W", "TIS", "NIQ", "MWT", "PT", "OWT"]), []
-    )
+    return Node(choice(TERMINALS), [])
 
 
 def random_internal(child_gen: Callable[[], Node]):
-    return Node(
-        choice(["ADD", "SUB", "MUL", "DIV", "MIN", "MAX"]),
-        [child_gen() for _ in range(2)],
-    )
+    return Node(choice(FUNCTIONS), [child_gen() for _ in range(2)])
 
 
 def random_generic(child_gen: Callable[[], Node]):
@@ -0,0 +1,370 @@
+from bisect import bisect_right
+from collections.abc import Generator, Sequence
+from functools import cached_property
+from typing import override
+import numpy as np
+from fjss.gp.batch import BatchPrograms, first_min
+from fjss.gp.ccgp import CCGP
+from fjss.gp.dag import ExpressionDAG
+from fjss.gp.program import TERMINALS, Node, Program, terminal_values
+from fjss.problem import Job, StaticFJSS, Time
+from fjss.queues.dynamic_priority_queue import DynamicPriorityQueue
+from fjss.queues.queue import Queue
+from fjss.simulate.simulation import MachineQueueItem, Simulation, SimulationSnapshot
+
+# largest number of decision situations evaluated at once
+MAX_CHUNK_SIZE = 1024
+
+
+class Decisions:
+    """
+    Decision situations of one kind (routing or sequencing) met along a
+    simulation: the terminal values of every candidate, the candidate that was
+    chosen and the index of the event during which the decision was made
+    """
+
+    events: list[int]
+    situations: list[list[list[float]]]
+    choices: list[int]
+
+    def __init__(self):
+        self.events = []
+        self.situations = []
+        self.choices = []
+
+    def record(self, event: int, situation: list[list[float]], choice: int):
+        self.events.append(event)
+        self.situations.append(situation)
+        self.choices.append(choice)
+
+    @cached_property
+    def terminals(self) -> np.ndarray:
+        num_candidates = max((len(s) for s in self.situations), default=0)
+        terminals = np.full(
+            (len(self.situations), num_candidates, len(TERMINALS)), np.nan
+        )
+        for i, situation in enumerate(self.situations):
+            terminals[i, : len(situation)] = situation
+        return terminals.transpose(2, 0, 1)
+
+    @cached_property
+    def valid(self) -> np.ndarray:
+        num_candidates = self.terminals.shape[2]
+        lengths = np.array([len(s) for s in self.situations], dtype=np.int64)
+        return np.arange(num_candidates) < lengths[:, None]
+
+    def chunks(self) -> Generator[tuple[int, int], None, None]:
+        """
+        Consecutive ranges of the situations. Children tend to disagree early,
+        so the ranges start small and grow up to MAX_CHUNK_SIZE, which bounds
+        the memory held for each evaluated subexpression.
+        """
+        start, size = 0, 16
+        while start < len(self.situations):
+            end = min(start + size, len(self.situations))
+            yield start, end
+            start, size = end, min(size * 2, MAX_CHUNK_SIZE)
+
+    def first_disagreement(self, root: Node) -> int | None:
+        """
+        Index of the first event where the given rule would have chosen a
+        different candidate, or None if it agrees with every decision
+        """
+        programs = BatchPrograms([root])
+        choices = np.array(self.choices, dtype=np.int64)
+        for start, end in self.chunks():
+            # the situations of the chunk as candidates of a single lane
+            terminals = self.terminals[:, start:end]
+            scores = programs.evaluate(
+                np.zeros(1, dtype=np.int64),
+                terminals.reshape(len(terminals), 1, -1),
+            ).reshape(end - start, -1)
+            scores[~self.valid[start:end]] = np.inf
+            disagreements = np.flatnonzero(first_min(scores) != choices[start:end])
+            if len(disagreements) > 0:
+                return self.events[start + disagreements[0]]
+        return None
+
+    def first_disagreements(self, roots: Sequence[Node]) -> list[int | None]:
+        """
+        first_disagreement for many rules at once, sharing the evaluation of
+        their common subexpressions. A rule is no longer evaluated once it has
+        disagreed.
+        """
+        dag = ExpressionDAG()
+        # positions in roots of the rules of every DAG id not yet decided
+        undecided: dict[int, list[int]] = {}
+        for i, id in enumerate(dag.add_all(roots)):
+            undecided.setdefault(id, []).append(i)
+        choices = np.array(self.choices, dtype=np.int64)
+        events: list[int | None] = [None] * len(roots)
+        for start, end in self.chunks():
+            if len(undecided) == 0:
+                break
+            ids = list(undecided)
+            valid = self.valid[start:end]
+            for i, value in dag.iter_evaluate(
+                ids, lambda t: self.terminals[TERMINALS.index(t), start:end]
+            ):
+                scores = np.where(valid, value, np.inf)
+                disagreements = np.flatnonzero(first_min(scores) != choices[start:end])
+                if len(disagreements) > 0:
+                    for position in undecided.pop(ids[i]):
+                        events[position] = self.events[start + disagreements[0]]
+        return events
+
+
+class RecordingQueue(Queue[MachineQueueItem]):
+    base: DynamicPriorityQueue[MachineQueueItem, float]
+    sim: Simulation
+    machine: int
+    decisions: Decisions
+
+    def __init__(
+        self,
+        base: DynamicPriorityQueue[MachineQueueItem, float],
+        sim: Simulation,
+        machine: int,
+        decisions: Decisions,
+    ):
+        self.base = base
+        self.sim = sim
+        self.machine = machine
+        self.decisions = decisions
+
+    @override
+    def push(self, value: MachineQueueItem):
+        self.base.push(value)
+
+    @override
+    def pop(self) -> MachineQueueItem | None:
+        items = list(self.base.values)
+        item = self.base.pop()
+        if item is not None:
+            situation = [
+                terminal_values(self.sim, i.job, i.op_index, self.machine)
+                for i in items
+            ]
+            choice = next(i for i, other in enumerate(items) if other is item)
+            self.decisions.record(self.sim.num_events, situation, choice)
+        return item
+
+    @override
+    def __len__(self) -> int:
+        return len(self.base)
+
+    @override
+    def snapshot(self) -> object:
+        return self.base.snapshot()
+
+    @override
+    def restore(self, snapshot: object):
+        self.base.restore(snapshot)
+
+
+class DecisionTrace:
+    problem: StaticFJSS
+    routing_rule: str
+    sequencing_rule: str
+    makespan: Time
+    routing: Decisions
+    sequencing: Decisions
+    snapshots: list[SimulationSnapshot]
+
+    def __init__(
+        self, problem: StaticFJSS, routing_rule: Program, sequencing_rule: Program
+    ):
+        self.problem = problem
+        self.routing_rule = str(routing_rule.root)
+        self.sequencing_rule = str(sequencing_rule.root)
+        self.makespan = Time(0)
+        self.routing = Decisions()
+        self.sequencing = Decisions()
+        self.snapshots = []
+
+
+class ReplayResult:
+    makespan: Time
+    skipped_time: Time
+    diverged_at: int | None
+
+    def __init__(self, makespan: Time, skipped_time: Time, diverged_at: int | None):
+        self.makespan = makespan
+        self.skipped_time = skipped_time
+        self.diverged_at = diverged_at
+
+
+class PrefixSharingEvaluator:
+    """
+    Evaluate offspring from the decision trace of a parent rule pair. A child
+    is checked against all recorded decision situations at once, and only
+    simulated from the last snapshot taken before the first decision it makes
+    differently; if it never disagrees, the parent's makespan is reused.
+    """
+
+    ccgp: CCGP
+    snapshot_interval: int
+    skipped_time: Time
+    total_time: Time
+
+    def __init__(self, ccgp: CCGP, snapshot_interval: int = 16):
+        self.ccgp = ccgp
+        self.snapshot_interval = snapshot_interval
+        self.skipped_time = Time(0)
+        self.total_time = Time(0)
+
+    def record(
+        self, routing_rule: Program, sequencing_rule: Program, problem: StaticFJSS
+    ) -> DecisionTrace:
+        trace = DecisionTrace(problem, routing_rule, sequencing_rule)
+        sim = self.ccgp.make_simulation(routing_rule, sequencing_rule, problem)
+        for queue in sim.machine_queues:
+            assert isinstance(queue.base, DynamicPriorityQueue)
+            queue.base = RecordingQueue(
+                queue.base, sim, queue.machine, trace.sequencing
+            )
+
+        route = sim.routing_rule
+
+        def recording_route(sim: Simulation, job: Job, op_index: int) -> int:
+            machine = route(sim, job, op_index)
+            machines = job.operations[op_index].machines
+            trace.routing.record(
+                sim.num_events,
+                [terminal_values(sim, job, op_index, m) for m in machines],
+                machines.index(machine),
+            )
+            return machine
+
+        sim.routing_rule = recording_route
+        while True:
+            if sim.num_events % self.snapshot_interval == 0:
+                trace.snapshots.append(sim.snapshot())
+            if not sim.step():
+                break
+        trace.makespan = sim.now
+        return trace
+
+    def replay(
+        self, trace: DecisionTrace, routing_rule: Program, sequencing_rule: Program
+    ) -> ReplayResult:
+        disagreements: list[int | None] = [None, None]
+        if str(routing_rule.root) != trace.routing_rule:
+            disagreements[0] = trace.routing.first_disagreement(routing_rule.root)
+        if str(sequencing_rule.root) != trace.sequencing_rule:
+            disagreements[1] = trace.sequencing.first_disagreement(
+                sequencing_rule.root
+            )
+        return self.resume(trace, routing_rule, sequencing_rule, disagreements)
+
+    def replay_many(
+        self, trace: DecisionTrace, pairs: Sequence[tuple[Program, Program]]
+    ) -> list[ReplayResult]:
+        """
+        Replay many children of the same parent, evaluating the subexpressions
+        they share only once per recorded decision situation
+        """
+        routing_disagreements = trace.routing.first_disagreements(
+            [routing_rule.root for routing_rule, _ in pairs]
+        )
+        sequencing_disagreements = trace.sequencing.first_disagreements(
+            [sequencing_rule.root for _, sequencing_rule in pairs]
+        )
+        return [
+            self.resume(trace, routing_rule, sequencing_rule, list(disagreements))
+            for (routing_rule, sequencing_rule), *disagreements in zip(
+                pairs, routing_disagreements, sequencing_disagreements
+            )
+        ]
+
+    def resume(
+        self,
+        trace: DecisionTrace,
+        routing_rule: Program,
+        sequencing_rule: Program,
+        disagreements: list[int | None],
+    ) -> ReplayResult:
+        events = [event for event in disagreements if event is not None]
+        if len(events) == 0:
+            result = ReplayResult(trace.makespan, trace.makespan, None)
+        else:
+            diverged_at = min(events)
+            i = bisect_right(
+                [snapshot.num_events for snapshot in trace.snapshots], diverged_at
+            )
+            snapshot = trace.snapshots[i - 1]
+            sim = self.ccgp.make_simulation(routing_rule, sequencing_rule, trace.problem)
+            sim.restore(snapshot)
+            result = ReplayResult(sim.simulate(), snapshot.now, diverged_at)
+
+        self.skipped_time += result.skipped_time
+        self.total_time += result.makespan
+        return result
+
+    def skipped_fraction(self) -> float:
+        """
+        Fraction of the simulated time of all replays that was not simulated again
+        """
+        return self.skipped_time / self.total_time if self.total_time > 0 else 0.0
+
+
+if __name__ == "__main__":
+    from random import seed
+    from time import perf_counter
+    from fjss.problem import DynamicFJSS
+
+    seed(1)
+    ccgp = CCGP()
+    routing_pop = ccgp.init_population()
+    sequencing_pop = ccgp.init_population()
+    for program in routing_pop + sequencing_pop:
+        program.fitness = 1.0
+    problem = DynamicFJSS(10, 300, 0.05).pregenerate("dynamic")
+    evaluator = PrefixSharingEvaluator(ccgp)
+    trace = evaluator.record(routing_pop[0], sequencing_pop[0], problem)
+
+    for decisions, pop in [
+        (trace.routing, routing_pop),
+        (trace.sequencing, sequencing_pop),
+    ]:
+        roots = [ccgp.generate_offspring(pop).root for _ in range(200)]
+        start = perf_counter()
+        many = decisions.first_disagreements(roots)
+        shared_seconds = perf_counter() - start
+        start = perf_counter()
+        single = [decisions.first_disagreement(root) for root in roots]
+        single_seconds = perf_counter() - start
+        assert many == single
+        print(
+            f"{len(roots)} rules on {len(decisions.situations)} decisions: "
+            f"shared {shared_seconds:.2f} s, one by one {single_seconds:.2f} s"
+        )
+
+    # children of the parent pair with one rule changed, replayed from the
+    # parent's trace against a full simulation
+    pairs = [
+        (ccgp.generate_offspring(routing_pop), sequencing_pop[0])
+        for _ in range(20)
+    ] + [
+        (routing_pop[0], ccgp.generate_offspring(sequencing_pop))
+        for _ in range(20)
+    ]
+    start = perf_counter()
+    full = [
+        ccgp.makespan(routing_rule, sequencing_rule, problem)
+        for routing_rule, sequencing_rule in pairs
+    ]
+    full_seconds = perf_counter() - start
+    start = perf_counter()
+    replayed = [
+        evaluator.replay(trace, routing_rule, sequencing_rule).makespan
+        for routing_rule, sequencing_rule in pairs
+    ]
+    replay_seconds = perf_counter() - start
+    assert replayed == full
+    print(
+        f"{len(pairs)} children: replay {replay_seconds:.2f} s, "
+        f"full simulation {full_seconds:.2f} s, "
+        f"{evaluator.skipped_fraction():.0%} of simulated time skipped"
+    )
+    assert [result.makespan for result in evaluator.replay_many(trace, pairs)] == full
@@ -0,0 +1,237 @@
+from collections.abc import Sequence
+from multiprocessing.shared_memory import SharedMemory
+from typing import Self
+from weakref import finalize
+import numpy as np
+from fjss.problem import Job, Operation, StaticFJSS, Time
+
+# (name of the shared memory block, index of the instance in it)
+InstanceRef = tuple[str, int]
+
+HEADER_SIZE = 4
+DIRECTORY_COLUMNS = 6
+
+
+def pack(problem: StaticFJSS) -> tuple[list[int], list[float]]:
+    """
+    Flatten an instance into integers
+        num_machines, num_jobs, num_ops, num_entries,
+        ops of every job, eligible machines of every operation, machines
+    and floats
+        lower_bound, arrival times, processing times
+    where machines and processing times list every (operation, machine) entry.
+    """
+    ops = [op for job in problem.jobs for op in job.operations]
+    machines = [machine for op in ops for machine in op.machines]
+    ints = [problem.num_machines, len(problem.jobs), len(ops), len(machines)]
+    ints += [len(job.operations) for job in problem.jobs]
+    ints += [len(op.machines) for op in ops]
+    ints += machines
+    floats = [problem.lower_bound]
+    floats += [job.arrival_time for job in problem.jobs]
+    floats += [time for op in ops for time in op.times]
+    return ints, floats
+
+
+def unpack(name: str, ints: np.ndarray, floats: np.ndarray) -> StaticFJSS:
+    num_machines, num_jobs, num_ops, num_entries = ints[:HEADER_SIZE].tolist()
+    ops_per_job = ints[HEADER_SIZE : HEADER_SIZE + num_jobs].tolist()
+    machines_per_op = ints[
+        HEADER_SIZE + num_jobs : HEADER_SIZE + num_jobs + num_ops
+    ].tolist()
+    machines = ints[HEADER_SIZE + num_jobs + num_ops :].tolist()
+    lower_bound = float(floats[0])
+    arrival_times = floats[1 : 1 + num_jobs].tolist()
+    times = floats[1 + num_jobs :].tolist()
+    assert len(machines) == len(times) == num_entries
+
+    jobs: list[Job] = []
+    op, entry = 0, 0
+    for i in range(num_jobs):
+        operations: list[Operation] = []
+        for j in range(ops_per_job[i]):
+            end = entry + machines_per_op[op]
+            operations.append(
+                Operation(
+                    f"{i + 1}:{j + 1}",
+                    {
+                        machine: Time(time)
+                        for machine, time in zip(
+                            machines[entry:end], times[entry:end]
+                        )
+                    },
+                )
+            )
+            op, entry = op + 1, end
+        jobs.append(Job(f"{i + 1}", Time(arrival_times[i]), operations))
+    return StaticFJSS(name, num_machines, jobs, lower_bound)
+
+
+def attach_shared_memory(name: str) -> SharedMemory:
+    """
+    Attach to a block owned by another process without taking part in its
+    cleanup. Before Python 3.13 attaching always registers the block with the
+    resource tracker, which is harmless for pool workers since they share the
+    tracker of the process that created it.
+    """
+    try:
+        return SharedMemory(name, track=False)  # type: ignore[call-arg]
+    except TypeError:
+        return SharedMemory(name)
+
+
+def release_shared_memory(shm: SharedMemory, owner: bool):
+    shm.close()
+    if owner:
+        shm.unlink()
+
+
+class InstanceStore:
+    """
+    Instances packed into one shared memory block. Workers attach to it by name
+    and rebuild the instances they are asked for straight from the shared
+    arrays, so tasks only need to carry an InstanceRef. Each worker still
+    materialises its own Job and Operation objects, once per instance.
+
+    The creating process owns the block: use the store as a context manager,
+    or call close(), to unlink it once the evaluation is done. A store that is
+    garbage collected first is released then.
+
+    Layout, in 8-byte words: a header (number of instances and sizes of the
+    three regions), a directory with the int offset, int count, float offset,
+    float count, name offset and name length of every instance, then the
+    int64 region, the float64 region and the UTF-8 names.
+    """
+
+    shm: SharedMemory
+    owner: bool
+    directory: np.ndarray
+    ints: np.ndarray
+    floats: np.ndarray
+    names: list[str]
+    cache: dict[int, StaticFJSS]
+    finalizer: finalize
+
+    def __init__(self, shm: SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        self.cache = {}
+        self.finalizer = finalize(self, release_shared_memory, shm, owner)
+        header = np.ndarray((HEADER_SIZE,), dtype=np.int64, buffer=shm.buf)
+        num_instances, num_ints, num_floats, num_name_bytes = header.tolist()
+        offset = header.nbytes
+        self.directory = np.ndarray(
+            (num_instances, DIRECTORY_COLUMNS),
+            dtype=np.int64,
+            buffer=shm.buf,
+            offset=offset,
+        )
+        offset += self.directory.nbytes
+        self.ints = np.ndarray(
+            (num_ints,), dtype=np.int64, buffer=shm.buf, offset=offset
+        )
+        offset += self.ints.nbytes
+        self.floats = np.ndarray(
+            (num_floats,), dtype=np.float64, buffer=shm.buf, offset=offset
+        )
+        offset += self.floats.nbytes
+        names = bytes(shm.buf[offset : offset + num_name_bytes])
+        self.names = [
+            names[start : start + length].decode()
+            for start, length in self.directory[:, 4:6].tolist()
+        ]
+
+    @staticmethod
+    def create(problems: Sequence[StaticFJSS]) -> "InstanceStore":
+        ints: list[int] = []
+        floats: list[float] = []
+        names = b""
+        directory: list[list[int]] = []
+        for problem in problems:
+            problem_ints, problem_floats = pack(problem)
+            name = problem.name.encode()
+            directory.append(
+                [
+                    len(ints),
+                    len(problem_ints),
+                    len(floats),
+                    len(problem_floats),
+                    len(names),
+                    len(name),
+                ]
+            )
+            ints += problem_ints
+            floats += problem_floats
+            names += name
+
+        header = [len(problems), len(ints), len(floats), len(names)]
+        size = 8 * (HEADER_SIZE + DIRECTORY_COLUMNS * len(problems))
+        size += 8 * (len(ints) + len(floats)) + len(names)
+        shm = SharedMemory(create=True, size=max(size, 1))
+        offset = 0
+        for values, dtype in [
+            (header, np.int64),
+            (directory, np.int64),
+            (ints, np.int64),
+            (floats, np.float64),
+        ]:
+            array = np.asarray(values, dtype=dtype).reshape(-1)
+            view = np.ndarray(array.shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            view[:] = array
+            offset += array.nbytes
+        shm.buf[offset : offset + len(names)] = names
+        return InstanceStore(shm, owner=True)
+
+    @staticmethod
+    def attach(name: str) -> "InstanceStore":
+        store = ATTACHED_STORES.get(name)
+        if store is None:
+            store = InstanceStore(attach_shared_memory(name), owner=False)
+            ATTACHED_STORES[name] = store
+        return store
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def refs(self) -> list[InstanceRef]:
+        return [(self.name, i) for i in range(len(self))]
+
+    def get(self, index: int) -> StaticFJSS:
+        problem = self.cache.get(index)
+        if problem is None:
+            int_offset, num_ints, float_offset, num_floats = self.directory[
+                index, :4
+            ].tolist()
+            problem = unpack(
+                self.names[index],
+                self.ints[int_offset : int_offset + num_ints],
+                self.floats[float_offset : float_offset + num_floats],
+            )
+            self.cache[index] = problem
+        return problem
+
+    def close(self):
+        if not self.finalizer.alive:
+            return
+        # the arrays are views of the block and must go before it is closed
+        del self.directory, self.ints, self.floats
+        self.finalizer()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object):
+        self.close()
+
+
+# stores attached to by this process, by block name
+ATTACHED_STORES: dict[str, InstanceStore] = {}
+
+
+def load_instance(ref: InstanceRef) -> StaticFJSS:
+    name, index = ref
+    return InstanceStore.attach(name).get(index)
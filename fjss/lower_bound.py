@@ -0,0 +1,132 @@
+from itertools import chain
+from math import ceil
+import numpy as np
+from fjss.problem import StaticFJSS, Time
+
+# at most this many distinct sets of eligible machines are checked by the
+# machine set bound, which is quadratic in their number
+MAX_MACHINE_SETS = 256
+
+
+class InstanceArrays:
+    """
+    The operations of an instance as flat arrays: every (operation, machine)
+    entry, and per operation its job and minimum processing time
+    """
+
+    num_machines: int
+    arrival_time: np.ndarray
+    op_job: np.ndarray
+    entry_op: np.ndarray
+    entry_machine: np.ndarray
+    entry_time: np.ndarray
+    min_time: np.ndarray
+
+    def __init__(self, problem: StaticFJSS):
+        ops = [op for job in problem.jobs for op in job.operations]
+        self.num_machines = problem.num_machines
+        self.arrival_time = np.array(
+            [job.arrival_time for job in problem.jobs], dtype=float
+        )
+        self.op_job = np.repeat(
+            np.arange(len(problem.jobs)), [len(job.operations) for job in problem.jobs]
+        )
+        num_entries = np.fromiter(
+            (len(op.machines) for op in ops), dtype=np.int64, count=len(ops)
+        )
+        total = int(num_entries.sum())
+        self.entry_op = np.repeat(np.arange(len(ops)), num_entries)
+        self.entry_machine = np.fromiter(
+            chain.from_iterable(op.machines for op in ops), dtype=np.int64, count=total
+        )
+        self.entry_time = np.fromiter(
+            chain.from_iterable(op.times for op in ops), dtype=float, count=total
+        )
+        starts = np.concatenate([[0], np.cumsum(num_entries)[:-1]]).astype(np.int64)
+        self.min_time = np.minimum.reduceat(self.entry_time, starts)
+
+
+def job_path_bound(arrays: InstanceArrays) -> float:
+    """
+    No job can finish before it has gone through all of its operations, each
+    on its fastest machine
+    """
+    work = np.bincount(
+        arrays.op_job, weights=arrays.min_time, minlength=len(arrays.arrival_time)
+    )
+    return float((arrays.arrival_time + work).max())
+
+
+def machine_set_bound(arrays: InstanceArrays) -> float:
+    """
+    The operations that can only run on a set S of machines keep S busy for at
+    least their total minimum processing time divided by |S|, starting no
+    earlier than the first arrival among them. S ranges over every single
+    machine, all the machines, and the distinct eligible sets of the
+    operations if there are not too many of them.
+    """
+    num_ops = len(arrays.min_time)
+    eligible = np.zeros((num_ops, arrays.num_machines), dtype=bool)
+    eligible[arrays.entry_op, arrays.entry_machine] = True
+    machine_sets = np.vstack(
+        [np.eye(arrays.num_machines, dtype=bool), np.ones(arrays.num_machines, bool)]
+    )
+    # rows as opaque byte strings, which np.unique sorts much faster than rows
+    packed = np.packbits(eligible, axis=1)
+    _, first = np.unique(
+        packed.view(np.dtype((np.void, packed.shape[1]))), return_index=True
+    )
+    if len(first) <= MAX_MACHINE_SETS:
+        machine_sets = np.vstack([machine_sets, eligible[first]])
+
+    # inside[s, g]: operation g has no eligible machine outside set s
+    outside = (~machine_sets).astype(np.float32) @ eligible.T.astype(np.float32)
+    inside = outside == 0
+    work = inside @ arrays.min_time
+    arrival = np.where(inside, arrays.arrival_time[arrays.op_job], np.inf).min(axis=1)
+    bounds = arrival + work / machine_sets.sum(axis=1)
+    return float(bounds[inside.any(axis=1)].max(initial=0.0))
+
+
+def lower_bound(problem: StaticFJSS) -> Time:
+    """
+    A lower bound on the makespan of any schedule of a static instance, the
+    largest of the job path and machine set bounds, rounded up when all times
+    are integers
+    """
+    if sum(len(job.operations) for job in problem.jobs) == 0:
+        return Time(0)
+    arrays = InstanceArrays(problem)
+    bound = max(job_path_bound(arrays), machine_set_bound(arrays))
+    integral = np.all(arrays.entry_time == np.round(arrays.entry_time)) and np.all(
+        arrays.arrival_time == np.round(arrays.arrival_time)
+    )
+    return Time(ceil(bound - 1e-9)) if integral else Time(bound)
+
+
+if __name__ == "__main__":
+    from random import seed
+    from time import perf_counter
+    from fjss.problem import FJSP_INSTANCES, DynamicFJSS
+    from fjss.simulate.heuristics import ROUTING_RULES, SEQUENCING_RULES
+    from fjss.simulate.simulation import Simulation
+
+    seed(1)
+    problems = list(FJSP_INSTANCES.values()) + [
+        DynamicFJSS(10, 200, 0.05).pregenerate(f"dynamic{i}") for i in range(5)
+    ]
+    for problem in problems:
+        bound = lower_bound(problem)
+        # every simulated schedule is feasible, so none can beat the bound
+        best = min(
+            Simulation(problem, make_queue, routing_rule).simulate()
+            for make_queue in SEQUENCING_RULES.values()
+            for routing_rule in ROUTING_RULES.values()
+        )
+        assert bound <= best, problem.name
+        print(problem.name, bound, problem.known_lower_bound, best)
+
+    problem = DynamicFJSS(20, 10000, 0.1).pregenerate("dynamic")
+    start = perf_counter()
+    bound = lower_bound(problem)
+    print(f"{problem.name}: {bound} in {(perf_counter() - start) * 1e3:.1f} ms")
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from collections.abc import Generator, Iterable, Iterator, KeysView
-from random import expovariate, randint, choices
+from collections.abc import Generator, Iterable, Iterator, Mapping
+from random import expovariate, randint, choices, seed as set_seed
 from typing import override
 from statistics import median
 import json
@@ -9,46 +9,93 @@ Time = float
 
 
 class Operation:
-    processing_times: dict[int, Time]
+    __slots__ = ("name", "machines", "times")
+
     name: str
+    # eligible machines and their processing times, in the order given
+    machines: tuple[int, ...]
+    times: tuple[Time, ...]
 
     def __init__(self, name: str, processing_times: dict[int, Time]):
         self.name = name
-        self.processing_times = dict(processing_times)
+        self.machines = tuple(processing_times.keys())
+        self.times = tuple(processing_times.values())
+
+    @property
+    def processing_times(self) -> dict[int, Time]:
+        """
+        A new dict of the processing time on every eligible machine
+        """
+        return dict(zip(self.machines, self.times))
 
-    def get_machines(self) -> KeysView[int]:
-        return self.processing_times.keys()
+    def get_machines(self) -> tuple[int, ...]:
+        return self.machines
 
     def get_processing_time(self, machine: int) -> Time:
-        return self.processing_times[machine]
+        return self.times[self.machines.index(machine)]
+
+
+# due date allowance of a job, as a multiple of its total median work
+DUE_DATE_ALLOWANCE = 1.5
 
 
 class Job:
+    __slots__ = (
+        "name",
+        "arrival_time",
+        "operations",
+        "weight",
+        "due_date",
+        "median_work_remaining",
+        "next_median_work_time",
+        "last_operation_ready_time",
+    )
+
     name: str
     arrival_time: Time
     operations: list[Operation]
     weight: float
+    due_date: Time
 
-    median_work_time: list[Time]
     median_work_remaining: list[Time]
+    next_median_work_time: list[float]
     last_operation_ready_time: Time
 
-    def __init__(self, name: str, arrival_time: Time, operations: list[Operation]):
+    def __init__(
+        self,
+        name: str,
+        arrival_time: Time,
+        operations: list[Operation],
+        due_date: Time | None = None,
+    ):
         self.name = name
         self.arrival_time = arrival_time
         self.operations = list(operations)
         self.weight = 1.0
 
-        self.median_work_time = []
+        median_work_time: list[Time] = []
         self.median_work_remaining = []
         self.last_operation_ready_time = Time(0)
         cur_median_work_remaining = Time(0)
 
         for op in reversed(operations):
-            cur_median_work_time = median(op.processing_times.values())
+            cur_median_work_time = median(op.times)
             cur_median_work_remaining += cur_median_work_time
             self.median_work_remaining.append(cur_median_work_remaining)
-            self.median_work_time.append(cur_median_work_time)
+            median_work_time.append(cur_median_work_time)
+
+        # the NPT terminal of every operation
+        self.next_median_work_time = [
+            float(median_work_time[i + 1]) if i + 1 < len(operations) else 0.0
+            for i in range(len(operations))
+        ]
+
+        total_median_work = self.median_work_remaining[-1] if operations else Time(0)
+        self.due_date = (
+            due_date
+            if due_date is not None
+            else arrival_time + DUE_DATE_ALLOWANCE * total_median_work
+        )
 
     def update_ready_time(self, new_ready_time: Time):
         self.last_operation_ready_time = new_ready_time
@@ -67,7 +114,9 @@ class FJSS(ABC):
 class StaticFJSS(FJSS):
     name: str
     jobs: list[Job]
-    lower_bound: Time | None
+    # the best lower bound from the literature, if the instance is listed there
+    known_lower_bound: Time | None
+    computed_lower_bound: Time | None
 
     def __init__(
         self,
@@ -79,7 +128,22 @@ class StaticFJSS(FJSS):
         super().__init__(num_machines)
         self.name = name
         self.jobs = list(jobs)
-        self.lower_bound = lower_bound
+        self.known_lower_bound = lower_bound
+        self.computed_lower_bound = None
+
+    @property
+    def lower_bound(self) -> Time:
+        """
+        The known lower bound, or one computed from the instance when there is
+        none
+        """
+        if self.known_lower_bound is not None:
+            return self.known_lower_bound
+        if self.computed_lower_bound is None:
+            from fjss.lower_bound import lower_bound
+
+            self.computed_lower_bound = lower_bound(self)
+        return self.computed_lower_bound
 
     @staticmethod
     def load(
@@ -147,18 +211,75 @@ class DynamicFJSS(FJSS):
     def pregenerate(self, name: str) -> StaticFJSS:
         return StaticFJSS(name, self.num_machines, list(self.generate_jobs()), None)
 
+    @staticmethod
+    def is_spec(name: str) -> bool:
+        return name.startswith("dynamic:")
+
+    @staticmethod
+    def from_spec(spec: str) -> "DynamicFJSS":
+        """
+        Parse a problem spec dynamic:<machines>:<jobs>:<utilization>
+        """
+        kind, num_machines, num_jobs, utilization_rate = spec.split(":")
+        if kind != "dynamic":
+            raise ValueError(f"invalid dynamic problem spec {spec}")
+        return DynamicFJSS(int(num_machines), int(num_jobs), float(utilization_rate))
+
+
+class InstanceLibrary(Mapping[str, StaticFJSS]):
+    """
+    The instances listed in instances.json under a directory, loaded on first
+    access so that importing this module (e.g. in a worker process) is cheap
+    """
+
+    directory: str
+    problems: dict[str, StaticFJSS] | None
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.problems = None
+
+    def load(self) -> dict[str, StaticFJSS]:
+        if self.problems is None:
+            problems: dict[str, StaticFJSS] = {}
+            with open(f"{self.directory}/instances.json") as f:
+                for instance in json.load(f):
+                    path: str = instance["path"]
+                    lower_bound: Time | None = instance["optimum"]
+                    if lower_bound is None:
+                        lower_bound = instance["bounds"]["lower"]
+                    assert lower_bound is not None
+                    problems[path] = StaticFJSS.load(
+                        f"{self.directory}/{path}", path, lower_bound
+                    )
+            self.problems = problems
+        return self.problems
+
+    @override
+    def __getitem__(self, path: str) -> StaticFJSS:
+        return self.load()[path]
+
+    @override
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.load())
+
+    @override
+    def __len__(self) -> int:
+        return len(self.load())
+
+
+FJSP_INSTANCES = InstanceLibrary("./fjsp-instances")
 
-FJSP_INSTANCES: dict[str, StaticFJSS] = {}
 
-with open("./fjsp-instances/instances.json") as f:
-    for instance in json.load(f):
-        path: str = instance["path"]
-        lower_bound: Time | None = instance["optimum"]
-        if lower_bound is None:
-            lower_bound = instance["bounds"]["lower"]
-        assert lower_bound is not None
-        problem = StaticFJSS.load("./fjsp-instances/" + path, path, lower_bound)
-        FJSP_INSTANCES[path] = problem
+def load_problem(instance: str, seed: str) -> StaticFJSS:
+    """
+    Resolve an instance name, either a path in FJSP_INSTANCES or a dynamic
+    problem spec generated from the seed
+    """
+    if not DynamicFJSS.is_spec(instance):
+        return FJSP_INSTANCES[instance]
+    set_seed(int(seed))
+    return DynamicFJSS.from_spec(instance).pregenerate(f"{instance}@{seed}")
 
 
 class StaticFJSSSet(Iterable[StaticFJSS]):
@@ -183,7 +304,7 @@ if __name__ == "__main__":
     sfjss = StaticFJSS.load("./fjsp-instances/barnes/mt10x.txt")
     assert sfjss.num_machines == 11
     assert len(sfjss.jobs) == 10
-    assert len(sfjss.jobs[0].operations[0].processing_times) == 1
+    assert len(sfjss.jobs[0].operations[0].machines) == 1
 
     dfjss = DynamicFJSS(10, 100, 0.8)
     assert dfjss.num_machines == 10
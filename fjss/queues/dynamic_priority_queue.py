@@ -35,3 +35,11 @@ class DynamicPriorityQueue[T, K: Comparable](Queue[T]):
     @override
     def __len__(self) -> int:
         return len(self.values)
+
+    @override
+    def snapshot(self) -> object:
+        return tuple(self.values)
+
+    @override
+    def restore(self, snapshot: object):
+        self.values = list(cast(tuple[T, ...], snapshot))
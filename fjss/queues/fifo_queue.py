@@ -1,5 +1,5 @@
 from collections import deque
-from typing import override
+from typing import cast, override
 
 from fjss.queues.queue import Queue
 
@@ -25,3 +25,11 @@ class FIFOQueue[T](Queue[T]):
     @override
     def __len__(self) -> int:
         return len(self.queue)
+
+    @override
+    def snapshot(self) -> object:
+        return tuple(self.queue)
+
+    @override
+    def restore(self, snapshot: object):
+        self.queue = deque(cast(tuple[T, ...], snapshot))
@@ -43,6 +43,16 @@ class PriorityQueue[T, K: Comparable](Queue[T]):
     def __len__(self) -> int:
         return len(self.heap)
 
+    @override
+    def snapshot(self) -> object:
+        return tuple(self.heap), self.counter
+
+    @override
+    def restore(self, snapshot: object):
+        heap, counter = cast(tuple[tuple[tuple[K, int, T], ...], int], snapshot)
+        self.heap = list(heap)
+        self.counter = counter
+
     def to_sorted_list(self) -> list[T]:
         """
         warning: this clears the list completely
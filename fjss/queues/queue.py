@@ -10,3 +10,17 @@ class Queue[T](ABC):
 
     @abstractmethod
     def __len__(self) -> int: ...
+
+    @abstractmethod
+    def snapshot(self) -> object:
+        """
+        Capture the contents of the queue. Stored values are shared with the
+        queue, so they must not be mutated afterwards.
+        """
+
+    @abstractmethod
+    def restore(self, snapshot: object):
+        """
+        Replace the contents of the queue with a snapshot taken from a queue of
+        the same type
+        """
@@ -0,0 +1,135 @@
+from typing import Callable, Protocol, Self, cast, override
+from collections.abc import Iterable
+from fjss.queues.queue import Queue
+
+
+class Comparable(Protocol):
+    def __lt__(self, value: Self, /) -> bool: ...
+
+
+class TournamentQueue[T, K: Comparable](Queue[T]):
+    """
+    Pops exactly what DynamicPriorityQueue pops when keys do not change while
+    values are queued, in O(log n) instead of O(n). Keys are computed once on
+    push, values are stored in the same positions as in DynamicPriorityQueue
+    (removal swaps with the last value), and a tournament tree over the
+    positions holds the first position with the smallest key.
+    """
+
+    values: list[T]
+    keys: list[K]
+    # tree[1] is the root, leaves start at capacity; -1 marks an empty leaf
+    tree: list[int]
+    capacity: int
+    key_fn: Callable[[T], K]
+
+    def __init__(
+        self,
+        lst: Iterable[T] = [],
+        key_fn: Callable[[T], K] = lambda value: cast(K, value),
+    ) -> None:
+        super().__init__()
+        self.key_fn = key_fn
+        self.values = list(lst)
+        self.keys = [key_fn(value) for value in self.values]
+        self.rebuild()
+
+    def rebuild(self):
+        self.capacity = 1
+        while self.capacity < len(self.values):
+            self.capacity *= 2
+        self.tree = [-1] * (2 * self.capacity)
+        self.tree[self.capacity : self.capacity + len(self.values)] = range(
+            len(self.values)
+        )
+        for node in range(self.capacity - 1, 0, -1):
+            self.tree[node] = self.winner(self.tree[2 * node], self.tree[2 * node + 1])
+
+    def winner(self, first: int, secnd: int) -> int:
+        """
+        The first of two positions unless the second has a strictly smaller
+        key, NaN keys ranking last
+        """
+        if secnd < 0:
+            return first
+        if first < 0:
+            return secnd
+        first_key, secnd_key = self.keys[first], self.keys[secnd]
+        if secnd_key != secnd_key:
+            return first
+        if first_key != first_key:
+            return secnd
+        return secnd if secnd_key < first_key else first
+
+    def update(self, position: int):
+        node = self.capacity + position
+        self.tree[node] = position if position < len(self.values) else -1
+        node //= 2
+        while node > 0:
+            self.tree[node] = self.winner(self.tree[2 * node], self.tree[2 * node + 1])
+            node //= 2
+
+    @override
+    def push(self, value: T):
+        self.values.append(value)
+        self.keys.append(self.key_fn(value))
+        if len(self.values) > self.capacity:
+            self.rebuild()
+        else:
+            self.update(len(self.values) - 1)
+
+    @override
+    def pop(self) -> T | None:
+        if len(self.values) == 0:
+            return None
+        # min() over the positions never replaces a NaN first key
+        i = 0 if self.keys[0] != self.keys[0] else self.tree[1]
+        value = self.values[i]
+        last = len(self.values) - 1
+        self.values[i] = self.values[last]
+        self.keys[i] = self.keys[last]
+        self.values.pop()
+        self.keys.pop()
+        self.update(last)
+        if i != last:
+            self.update(i)
+        return value
+
+    @override
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @override
+    def snapshot(self) -> object:
+        return tuple(self.values), tuple(self.keys)
+
+    @override
+    def restore(self, snapshot: object):
+        values, keys = cast(tuple[tuple[T, ...], tuple[K, ...]], snapshot)
+        self.values = list(values)
+        self.keys = list(keys)
+        self.rebuild()
+
+
+if __name__ == "__main__":
+    from random import randint, seed
+    from fjss.queues.dynamic_priority_queue import DynamicPriorityQueue
+
+    seed(1)
+    for _ in range(200):
+        keys = [float(randint(0, 5)) for _ in range(50)] + [float("nan")] * 5
+        tq: TournamentQueue[int, float] = TournamentQueue(key_fn=lambda i: keys[i])
+        dq: DynamicPriorityQueue[int, float] = DynamicPriorityQueue(
+            key_fn=lambda i: keys[i]
+        )
+        for _ in range(200):
+            if randint(0, 2) > 0:
+                value = randint(0, len(keys) - 1)
+                tq.push(value)
+                dq.push(value)
+            else:
+                assert tq.pop() == dq.pop()
+            assert tq.values == dq.values
+        while len(dq) > 0:
+            assert tq.pop() == dq.pop()
+        assert tq.pop() is None
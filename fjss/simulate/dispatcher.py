@@ -0,0 +1,194 @@
+from collections.abc import Callable, Generator
+from typing import Self, override
+from fjss.gp.compiler import RoutingRule
+from fjss.problem import FJSS, Job, Time
+from fjss.queues.queue import Queue
+from fjss.simulate.simulation import MachineQueueItem, Simulation
+
+
+class OnlineFJSS(FJSS):
+    """
+    A shop whose jobs are not known in advance but reported as they arrive
+    """
+
+    @override
+    def generate_jobs(self) -> Generator[Job, None, None]:
+        yield from ()
+
+
+class Decision:
+    """
+    Either "route", assigning an operation to the queue of a machine, or
+    "start", telling a machine to start processing an operation
+    """
+
+    kind: str
+    time: Time
+    job: str
+    op_index: int
+    machine: int
+
+    def __init__(self, kind: str, time: Time, job: str, op_index: int, machine: int):
+        self.kind = kind
+        self.time = time
+        self.job = job
+        self.op_index = op_index
+        self.machine = machine
+
+    def to_json(self) -> dict[str, object]:
+        return {
+            "kind": self.kind,
+            "time": self.time,
+            "job": self.job,
+            "op_index": self.op_index,
+            "machine": self.machine,
+        }
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"Decision({self.kind!r}, {self.time}, {self.job!r}, "
+            f"{self.op_index}, {self.machine})"
+        )
+
+
+class Dispatcher(Simulation):
+    """
+    A long-running simulation driven by events from the shop floor instead of
+    its own event queue. Every event is applied at the time it is reported,
+    and the routing and sequencing decisions it triggers are returned.
+
+    Machines start an operation only when told it has finished the previous
+    one, so actual processing times may differ from the nominal ones. A
+    machine that is down starts nothing and is not routed to unless none of an
+    operation's eligible machines is up; the operation it is processing, if
+    any, is still reported through operation_finished.
+    """
+
+    rule: RoutingRule
+    running: list[MachineQueueItem | None]
+    down: list[bool]
+    active_jobs: dict[str, Job]
+    decisions: list[Decision]
+
+    def __init__(
+        self,
+        num_machines: int,
+        make_queue: Callable[[Self, int], Queue[MachineQueueItem]],
+        routing_rule: RoutingRule,
+    ):
+        """
+        Args:
+            num_machines: The number of machines of the shop.
+            make_queue: As for Simulation.
+            routing_rule: As for Simulation, also accepting the candidate
+                          machines to choose from.
+        """
+        super().__init__(OnlineFJSS(num_machines), make_queue, self.route)
+        self.rule = routing_rule
+        self.running = [None] * num_machines
+        self.down = [False] * num_machines
+        self.active_jobs = {}
+        self.decisions = []
+
+    def check_machine(self, machine: int):
+        if not 0 <= machine < self.problem.num_machines:
+            raise ValueError(f"machine {machine} is not in the shop")
+
+    def advance(self, time: Time):
+        """
+        Start handling an event; events are validated before this is called,
+        so that a rejected event leaves the dispatcher unchanged
+        """
+        if time < self.now:
+            raise ValueError(f"event at time {time} is earlier than {self.now}")
+        self.now = time
+        self.num_events += 1
+        self.decisions = []
+
+    def job_arrived(self, time: Time, job: Job) -> list[Decision]:
+        if job.name in self.active_jobs:
+            raise ValueError(f"job {job.name} is already in the shop")
+        if len(job.operations) == 0:
+            raise ValueError(f"job {job.name} has no operations")
+        for op in job.operations:
+            if len(op.machines) == 0:
+                raise ValueError(f"operation {op.name} has no eligible machine")
+            for machine in op.machines:
+                self.check_machine(machine)
+        self.advance(time)
+        self.active_jobs[job.name] = job
+        self.handle_new_operation(job, 0)
+        return self.decisions
+
+    def operation_finished(self, time: Time, machine: int) -> list[Decision]:
+        self.check_machine(machine)
+        item = self.running[machine]
+        if item is None:
+            raise ValueError(f"machine {machine} is not processing any operation")
+        self.advance(time)
+        self.running[machine] = None
+        self.machines_busy_until[machine] = time
+        next_op_index = item.op_index + 1
+        if next_op_index < len(item.job.operations):
+            self.handle_new_operation(item.job, next_op_index)
+        else:
+            del self.active_jobs[item.job.name]
+        if self.recycle:
+            self.free_items.append(item)
+        self.update_queue(machine)
+        return self.decisions
+
+    def machine_down(self, time: Time, machine: int) -> list[Decision]:
+        """
+        Take a machine out of service, routing the operations waiting in its
+        queue to the machines that are still up
+        """
+        self.check_machine(machine)
+        self.advance(time)
+        self.down[machine] = True
+        for item in self.machine_queues[machine].drain():
+            self.dispatch(item.job, item.op_index)
+        return self.decisions
+
+    def machine_up(self, time: Time, machine: int) -> list[Decision]:
+        self.check_machine(machine)
+        self.advance(time)
+        self.down[machine] = False
+        self.update_queue(machine)
+        return self.decisions
+
+    def route(self, sim: Simulation, job: Job, op_index: int) -> int:
+        """
+        Apply the routing rule to the eligible machines that are up
+        """
+        machines = job.operations[op_index].machines
+        if not any(self.down[machine] for machine in machines):
+            return self.rule(self, job, op_index)
+        candidates = [machine for machine in machines if not self.down[machine]]
+        return self.rule(self, job, op_index, candidates or None)
+
+    @override
+    def update_queue(self, machine: int):
+        if self.running[machine] is not None or self.down[machine]:
+            return
+        item = self.machine_queues[machine].pop()
+        if item is None:
+            return
+        processing_time = item.get_operation().get_processing_time(machine)
+        self.machines_busy_until[machine] = self.now + processing_time
+        self.running[machine] = item
+        self.decisions.append(
+            Decision("start", self.now, item.job.name, item.op_index, machine)
+        )
+
+    @override
+    def handle_new_operation(self, job: Job, op_index: int):
+        job.update_ready_time(self.now)
+        self.dispatch(job, op_index)
+
+    def dispatch(self, job: Job, op_index: int):
+        machine = self.routing_rule(self, job, op_index)
+        self.decisions.append(Decision("route", self.now, job.name, op_index, machine))
+        self.machine_queues[machine].push(self.new_item(job, op_index))
+        self.update_queue(machine)
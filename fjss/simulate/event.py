@@ -4,11 +4,15 @@ from abc import ABC, abstractmethod
 
 
 class SimulationEvent(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def arrival_time(self) -> Time: ...
 
 
 class NewJobEvent(SimulationEvent):
+    __slots__ = ("job",)
+
     job: Job
 
     def __init__(self, job: Job) -> None:
@@ -21,6 +25,8 @@ class NewJobEvent(SimulationEvent):
 
 
 class MachineFinishEvent(SimulationEvent):
+    __slots__ = ("time", "machine", "job", "operation_index")
+
     time: Time
     machine: int
     job: Job
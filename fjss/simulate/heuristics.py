@@ -1,11 +1,17 @@
-from typing import Callable
+from collections.abc import Callable
+from math import exp
 from fjss.problem import Job, Time
+from fjss.queues.dynamic_priority_queue import DynamicPriorityQueue
 from fjss.queues.fifo_queue import FIFOQueue
 from fjss.queues.priority_queue import PriorityQueue
+from fjss.queues.queue import Queue
 from fjss.simulate.simulation import MachineQueueItem, Simulation
 
 FIFOMachineQueue = FIFOQueue[MachineQueueItem]
 
+# look-ahead parameter of ATC
+ATC_K = 2.0
+
 
 class SPTMachineQueue(PriorityQueue[MachineQueueItem, Time]):
     def __init__(self, sim: Simulation, machine: int):
@@ -14,32 +20,127 @@ class SPTMachineQueue(PriorityQueue[MachineQueueItem, Time]):
         )
 
 
-RoutingRule = Callable[[Simulation, Job, int], int]
+class LPTMachineQueue(PriorityQueue[MachineQueueItem, Time]):
+    def __init__(self, sim: Simulation, machine: int):
+        super().__init__(
+            [], key_fn=lambda item: -item.get_operation().get_processing_time(machine)
+        )
 
 
-def routing_rule_lwq(sim: Simulation, job: Job, op_index: int) -> int:
+class EDDMachineQueue(PriorityQueue[MachineQueueItem, Time]):
+    def __init__(self, sim: Simulation, machine: int):
+        super().__init__([], key_fn=lambda item: item.job.due_date)
+
+
+def work_remaining(item: MachineQueueItem) -> Time:
+    """
+    Median work of the item's operation and of every later operation of its
+    job. Job.median_work_remaining is stored last operation first, which the
+    GP terminal WKR relies on, so it is read from the other end here.
+    """
+    return item.job.median_work_remaining[len(item.job.operations) - 1 - item.op_index]
+
+
+class MWKRMachineQueue(PriorityQueue[MachineQueueItem, Time]):
+    def __init__(self, sim: Simulation, machine: int):
+        super().__init__([], key_fn=lambda item: -work_remaining(item))
+
+
+def work_in_next_queue(sim: Simulation, item: MachineQueueItem) -> Time:
+    """
+    WINQ: the smallest workload among the machines able to process the next
+    operation of the job, or 0 for the last operation
+    """
+    if item.op_index + 1 >= len(item.job.operations):
+        return Time(0)
     return min(
-        job.operations[op_index].get_machines(),
-        key=lambda machine: sim.machine_queues[machine].total_work,
+        sim.state.workload[machine]
+        for machine in item.job.operations[item.op_index + 1].machines
     )
 
 
+class PTWINQMachineQueue(DynamicPriorityQueue[MachineQueueItem, Time]):
+    def __init__(self, sim: Simulation, machine: int):
+        super().__init__(
+            key_fn=lambda item: item.get_operation().get_processing_time(machine)
+            + work_in_next_queue(sim, item)
+        )
+
+
+class ATCMachineQueue(DynamicPriorityQueue[MachineQueueItem, float]):
+    def __init__(self, sim: Simulation, machine: int):
+        def key_fn(item: MachineQueueItem) -> float:
+            processing_time = item.get_operation().get_processing_time(machine)
+            # the item being ranked is still counted in the queue
+            average_processing_time = (
+                sim.state.workload[machine] / sim.state.queue_length[machine]
+            )
+            slack = item.job.due_date - sim.now - work_remaining(item)
+            return -(item.job.weight / processing_time) * exp(
+                -max(slack, 0.0) / (ATC_K * average_processing_time)
+            )
+
+        super().__init__(key_fn=key_fn)
+
+
+SequencingRule = Callable[[Simulation, int], Queue[MachineQueueItem]]
+RoutingRule = Callable[[Simulation, Job, int], int]
+
+
+def routing_rule_lwq(sim: Simulation, job: Job, op_index: int) -> int:
+    return min(job.operations[op_index].machines, key=sim.state.workload.__getitem__)
+
+
 def routing_rule_lqs(sim: Simulation, job: Job, op_index: int) -> int:
     return min(
-        job.operations[op_index].get_machines(),
-        key=lambda machine: len(sim.machine_queues[machine]),
+        job.operations[op_index].machines, key=sim.state.queue_length.__getitem__
     )
 
 
 def routing_rule_ert(sim: Simulation, job: Job, op_index: int) -> int:
-    return min(
-        job.operations[op_index].get_machines(),
-        key=lambda machine: sim.machines_busy_until[machine],
-    )
+    return min(job.operations[op_index].machines, key=sim.state.busy_until.__getitem__)
 
 
 def routing_rule_sbt(sim: Simulation, job: Job, op_index: int) -> int:
-    return min(
-        job.operations[op_index].get_machines(),
-        key=lambda machine: sim.machine_queues[machine].busy_time,
+    return min(job.operations[op_index].machines, key=sim.state.busy_time.__getitem__)
+
+
+def routing_rule_spt(sim: Simulation, job: Job, op_index: int) -> int:
+    op = job.operations[op_index]
+    return op.machines[min(range(len(op.times)), key=op.times.__getitem__)]
+
+
+def routing_rule_eft(sim: Simulation, job: Job, op_index: int) -> int:
+    """
+    Earliest finish time: the machine that would complete the operation first if
+    it were processed after everything already waiting there
+    """
+    op = job.operations[op_index]
+    state = sim.state
+    machine, _ = min(
+        zip(op.machines, op.times),
+        key=lambda entry: max(state.busy_until[entry[0]], sim.now)
+        + state.workload[entry[0]]
+        + entry[1],
     )
+    return machine
+
+
+SEQUENCING_RULES: dict[str, SequencingRule] = {
+    "FIFO": lambda sim, machine: FIFOMachineQueue(),
+    "SPT": SPTMachineQueue,
+    "LPT": LPTMachineQueue,
+    "EDD": EDDMachineQueue,
+    "MWKR": MWKRMachineQueue,
+    "PT+WINQ": PTWINQMachineQueue,
+    "ATC": ATCMachineQueue,
+}
+
+ROUTING_RULES: dict[str, RoutingRule] = {
+    "LWQ": routing_rule_lwq,
+    "LQS": routing_rule_lqs,
+    "ERT": routing_rule_ert,
+    "SBT": routing_rule_sbt,
+    "SPT": routing_rule_spt,
+    "EFT": routing_rule_eft,
+}
@@ -0,0 +1,112 @@
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, override
+import json
+from fjss.problem import Job, Operation, Time
+from fjss.simulate.dispatcher import Dispatcher
+
+
+def parse_job(time: Time, job: dict[str, Any]) -> Job:
+    """
+    Build a job from {"name": ..., "operations": [{machine: time, ...}, ...]},
+    with an optional "due_date"
+    """
+    name = str(job["name"])
+    operations = [
+        Operation(
+            f"{name}:{i + 1}",
+            {int(machine): Time(t) for machine, t in processing_times.items()},
+        )
+        for i, processing_times in enumerate(job["operations"])
+    ]
+    return Job(name, time, operations, job.get("due_date"))
+
+
+def handle_request(dispatcher: Dispatcher, request: dict[str, Any]) -> dict[str, Any]:
+    """
+    Apply one event, given as {"event": ..., "time": ..., ...}, returning the
+    decisions it triggered
+    """
+    time = Time(request["time"])
+    match request["event"]:
+        case "job_arrived":
+            decisions = dispatcher.job_arrived(time, parse_job(time, request["job"]))
+        case "operation_finished":
+            decisions = dispatcher.operation_finished(time, int(request["machine"]))
+        case "machine_down":
+            decisions = dispatcher.machine_down(time, int(request["machine"]))
+        case "machine_up":
+            decisions = dispatcher.machine_up(time, int(request["machine"]))
+        case event:
+            raise ValueError(f"invalid event {event!r}")
+    return {"decisions": [decision.to_json() for decision in decisions]}
+
+
+def dispatcher_state(dispatcher: Dispatcher) -> dict[str, Any]:
+    return {
+        "time": dispatcher.now,
+        "events": dispatcher.num_events,
+        "active_jobs": len(dispatcher.active_jobs),
+        "queue_length": dispatcher.state.queue_length,
+        "running": [
+            None if item is None else [item.job.name, item.op_index]
+            for item in dispatcher.running
+        ],
+        "down": dispatcher.down,
+    }
+
+
+def make_server(dispatcher: Dispatcher, host: str, port: int) -> HTTPServer:
+    """
+    A single-threaded JSON endpoint for a dispatcher: POST an event to get its
+    decisions, GET for a summary of the shop. Requests are handled one at a
+    time, in the order they are received.
+    """
+
+    class DispatchHandler(BaseHTTPRequestHandler):
+        def reply(self, status: int, body: dict[str, Any]):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self.reply(200, dispatcher_state(dispatcher))
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                request = json.loads(self.rfile.read(length))
+                self.reply(200, handle_request(dispatcher, request))
+            except (IndexError, KeyError, TypeError, ValueError) as e:
+                self.reply(400, {"error": f"{type(e).__name__}: {e}"})
+
+        @override
+        def log_message(self, format: str, *args: Any):
+            dispatcher.log(format % args)
+
+    return HTTPServer((host, port), DispatchHandler)
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+    from fjss.gp.ccgp import CCGP
+    from fjss.gp.program import Program, parse_node
+
+    parser = ArgumentParser(description="Serve dispatching decisions of a GP rule pair")
+    parser.add_argument("routing", help="routing rule, e.g. ADD(PT,NIQ)")
+    parser.add_argument("sequencing", help="sequencing rule, e.g. MIN(PT,WKR)")
+    parser.add_argument("--machines", type=int, required=True)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    dispatcher = CCGP().make_dispatcher(
+        Program(parse_node(args.routing)),
+        Program(parse_node(args.sequencing)),
+        args.machines,
+    )
+    server = make_server(dispatcher, args.host, args.port)
+    print(f"Serving on http://{args.host}:{args.port}")
+    server.serve_forever()
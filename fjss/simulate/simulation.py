@@ -7,6 +7,8 @@ from fjss.simulate.event import MachineFinishEvent, NewJobEvent, SimulationEvent
 
 
 class MachineQueueItem:
+    __slots__ = ("job", "op_index")
+
     job: Job
     op_index: int
 
@@ -21,22 +23,51 @@ class MachineQueueItem:
 VERBOSE = getenv("VERBOSE") == "1"
 
 
+class MachineState:
+    """
+    State of every machine in flat lists indexed by machine, kept up to date by
+    the machine queues so that rules can read it in O(1)
+    """
+
+    queue_length: list[int]
+    workload: list[Time]
+    busy_until: list[Time]
+    busy_time: list[Time]
+
+    def __init__(self, num_machines: int):
+        self.queue_length = [0] * num_machines
+        self.workload = [Time(0)] * num_machines
+        self.busy_until = [Time(0)] * num_machines
+        self.busy_time = [Time(0)] * num_machines
+
+
 class MachineQueue(Queue[MachineQueueItem]):
     base: Queue[MachineQueueItem]
     machine: int
-    total_work: Time
-    busy_time: Time
+    state: MachineState
 
-    def __init__(self, base: Queue[MachineQueueItem], machine: int):
+    def __init__(
+        self, base: Queue[MachineQueueItem], machine: int, state: MachineState
+    ):
         self.base = base
         self.machine = machine
-        self.total_work = Time(0)
-        self.busy_time = Time(0)
+        self.state = state
+
+    @property
+    def total_work(self) -> Time:
+        return self.state.workload[self.machine]
+
+    @property
+    def busy_time(self) -> Time:
+        return self.state.busy_time[self.machine]
 
     @override
     def push(self, value: MachineQueueItem):
         self.base.push(value)
-        self.total_work += value.get_operation().get_processing_time(self.machine)
+        self.state.queue_length[self.machine] += 1
+        self.state.workload[self.machine] += value.get_operation().get_processing_time(
+            self.machine
+        )
 
     @override
     def pop(self) -> MachineQueueItem | None:
@@ -44,22 +75,81 @@ class MachineQueue(Queue[MachineQueueItem]):
         if item is None:
             return None
         processing_time = item.get_operation().get_processing_time(self.machine)
-        self.total_work -= processing_time
-        self.busy_time += processing_time
+        self.state.queue_length[self.machine] -= 1
+        self.state.workload[self.machine] -= processing_time
+        self.state.busy_time[self.machine] += processing_time
         return item
 
+    def drain(self) -> list[MachineQueueItem]:
+        """
+        Remove every item without processing them, in the order they would
+        have been popped
+        """
+        items: list[MachineQueueItem] = []
+        while (item := self.base.pop()) is not None:
+            items.append(item)
+        self.state.queue_length[self.machine] = 0
+        self.state.workload[self.machine] = Time(0)
+        return items
+
     @override
     def __len__(self) -> int:
         return len(self.base)
 
+    @override
+    def snapshot(self) -> object:
+        return self.base.snapshot()
+
+    @override
+    def restore(self, snapshot: object):
+        self.base.restore(snapshot)
+
+
+class SimulationSnapshot:
+    """
+    Copy of the state of a simulation between two events. Events and queue items
+    are immutable, so they are shared with the simulation rather than copied.
+    """
+
+    now: Time
+    num_events: int
+    events: object
+    queues: list[object]
+    queue_length: list[int]
+    workload: list[Time]
+    busy_until: list[Time]
+    busy_time: list[Time]
+    jobs: list[Job]
+    ready_times: list[Time]
+
+    def __init__(self, sim: "Simulation"):
+        self.now = sim.now
+        self.num_events = sim.num_events
+        self.events = sim.events.snapshot()
+        self.queues = [queue.snapshot() for queue in sim.machine_queues]
+        self.queue_length = list(sim.state.queue_length)
+        self.workload = list(sim.state.workload)
+        self.busy_until = list(sim.state.busy_until)
+        self.busy_time = list(sim.state.busy_time)
+        self.jobs = sim.jobs
+        self.ready_times = [job.last_operation_ready_time for job in sim.jobs]
+
 
 class Simulation:
     problem: FJSS
     now: Time
+    num_events: int
+    jobs: list[Job]
     events: PriorityQueue[SimulationEvent, Time]
+    state: MachineState
     machine_queues: list[MachineQueue]
     machines_busy_until: list[Time]
     routing_rule: Callable[[Self, Job, int], int]
+    # handled finish events and started queue items, reused for later operations
+    # as long as no snapshot may share them
+    recycle: bool
+    free_events: list[MachineFinishEvent]
+    free_items: list[MachineQueueItem]
 
     def __init__(
         self,
@@ -81,25 +171,67 @@ class Simulation:
         """
         self.problem = problem
         self.now = Time(0)
+        self.num_events = 0
+        self.jobs = list(problem.generate_jobs())
         self.events = PriorityQueue(
-            (NewJobEvent(job) for job in problem.generate_jobs()),
+            (NewJobEvent(job) for job in self.jobs),
             lambda event: event.arrival_time(),
         )
+        self.state = MachineState(problem.num_machines)
         self.machine_queues = [
-            MachineQueue(make_queue(self, i), i) for i in range(problem.num_machines)
+            MachineQueue(make_queue(self, i), i, self.state)
+            for i in range(problem.num_machines)
         ]
-        self.machines_busy_until = [Time(0) for _ in range(problem.num_machines)]
+        self.machines_busy_until = self.state.busy_until
         self.routing_rule = routing_rule
+        self.recycle = True
+        self.free_events = []
+        self.free_items = []
 
     def simulate(self) -> Time:
-        while True:
-            event = self.events.pop()
-            if event is None:
-                break
-            self.now = event.arrival_time()
-            self.handle_event(event)
+        while self.step():
+            pass
         return self.now
 
+    def step(self) -> bool:
+        """
+        Handle the next event, returning False if there was none left
+        """
+        event = self.events.pop()
+        if event is None:
+            return False
+        self.now = event.arrival_time()
+        self.handle_event(event)
+        self.num_events += 1
+        if self.recycle and isinstance(event, MachineFinishEvent):
+            self.free_events.append(event)
+        return True
+
+    def snapshot(self) -> SimulationSnapshot:
+        # the snapshot shares the pending events and queued items
+        self.recycle = False
+        return SimulationSnapshot(self)
+
+    def restore(self, snapshot: SimulationSnapshot):
+        """
+        Continue from a snapshot, which may come from another simulation of the
+        same jobs with different rules
+        """
+        self.recycle = False
+        self.now = snapshot.now
+        self.num_events = snapshot.num_events
+        self.events.restore(snapshot.events)
+        for queue, queue_snapshot in zip(self.machine_queues, snapshot.queues):
+            queue.restore(queue_snapshot)
+        # in place, as the lists are shared with machines_busy_until and the queues
+        self.state.queue_length[:] = snapshot.queue_length
+        self.state.workload[:] = snapshot.workload
+        self.state.busy_until[:] = snapshot.busy_until
+        self.state.busy_time[:] = snapshot.busy_time
+        self.jobs = snapshot.jobs
+        for job, ready_time in zip(snapshot.jobs, snapshot.ready_times):
+            job.update_ready_time(ready_time)
+
     def handle_event(self, event: SimulationEvent):
         if isinstance(event, NewJobEvent):
             self.handle_new_job(event)
@@ -116,12 +248,36 @@ class Simulation:
             return
         processing_time = item.get_operation().get_processing_time(machine)
         finish_time = self.now + processing_time
-        finish_event = MachineFinishEvent(finish_time, machine, item.job, item.op_index)
+        finish_event = self.new_finish_event(
+            finish_time, machine, item.job, item.op_index
+        )
         self.machines_busy_until[machine] = finish_time
         self.log(
             f"Machine {machine + 1} starts processing operation {item.get_operation().name} at time {self.now}"
         )
         self.events.push(finish_event)
+        if self.recycle:
+            self.free_items.append(item)
+
+    def new_item(self, job: Job, op_index: int) -> MachineQueueItem:
+        if len(self.free_items) == 0:
+            return MachineQueueItem(job, op_index)
+        item = self.free_items.pop()
+        item.job = job
+        item.op_index = op_index
+        return item
+
+    def new_finish_event(
+        self, time: Time, machine: int, job: Job, operation_index: int
+    ) -> MachineFinishEvent:
+        if len(self.free_events) == 0:
+            return MachineFinishEvent(time, machine, job, operation_index)
+        event = self.free_events.pop()
+        event.time = time
+        event.machine = machine
+        event.job = job
+        event.operation_index = operation_index
+        return event
 
     def handle_new_operation(self, job: Job, op_index: int):
         if op_index >= len(job.operations):
@@ -131,7 +287,7 @@ class Simulation:
         self.log(
             f"Routing operation {job.operations[op_index].name} to machine {machine + 1} at time {self.now}"
         )
-        self.machine_queues[machine].push(MachineQueueItem(job, op_index))
+        self.machine_queues[machine].push(self.new_item(job, op_index))
         self.update_queue(machine)
 
     def handle_new_job(self, event: NewJobEvent):
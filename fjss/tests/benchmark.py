@@ -0,0 +1,151 @@
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from csv import DictReader, DictWriter
+from os.path import exists, getsize
+from time import perf_counter
+from fjss.problem import DynamicFJSS, StaticFJSSSet, load_problem
+from fjss.simulate.heuristics import ROUTING_RULES, SEQUENCING_RULES
+from fjss.simulate.simulation import Simulation
+
+COLUMNS = [
+    "routing",
+    "sequencing",
+    "instance",
+    "seed",
+    "makespan",
+    "lower_bound",
+    "normalized_makespan",
+    "seconds",
+]
+NUMERIC_COLUMNS = ["makespan", "lower_bound", "normalized_makespan", "seconds"]
+
+# (routing rule, sequencing rule, instance, seed), seed being "" for static instances
+Cell = tuple[str, str, str, str]
+
+
+def run_cell(cell: Cell) -> dict[str, str]:
+    routing, sequencing, instance, seed = cell
+    problem = load_problem(instance, seed)
+    start = perf_counter()
+    makespan = Simulation(
+        problem, SEQUENCING_RULES[sequencing], ROUTING_RULES[routing]
+    ).simulate()
+    seconds = perf_counter() - start
+    lower_bound = problem.lower_bound or float("nan")
+    return {
+        "routing": routing,
+        "sequencing": sequencing,
+        "instance": instance,
+        "seed": seed,
+        "makespan": str(makespan),
+        "lower_bound": str(lower_bound),
+        "normalized_makespan": str(makespan / lower_bound),
+        "seconds": str(seconds),
+    }
+
+
+def make_grid(
+    routing_rules: list[str],
+    sequencing_rules: list[str],
+    instances: list[str],
+    seeds: list[str],
+) -> list[Cell]:
+    names: list[tuple[str, str]] = []
+    for instance in instances:
+        if DynamicFJSS.is_spec(instance):
+            names.extend((instance, seed) for seed in seeds)
+        else:
+            names.extend((problem.name, "") for problem in StaticFJSSSet(instance))
+    return [
+        (routing, sequencing, instance, seed)
+        for routing in routing_rules
+        for sequencing in sequencing_rules
+        for instance, seed in names
+    ]
+
+
+def is_complete(row: dict[str | None, str | None]) -> bool:
+    if any(row.get(column) is None for column in COLUMNS) or None in row:
+        return False
+    try:
+        for column in NUMERIC_COLUMNS:
+            float(row[column] or "")
+    except ValueError:
+        return False
+    return True
+
+
+def completed_cells(path: str) -> set[Cell]:
+    """
+    The cells of the rows that were written in full
+    """
+    if not exists(path):
+        return set()
+    with open(path, newline="") as f:
+        return {
+            (row["routing"], row["sequencing"], row["instance"], row["seed"])
+            for row in DictReader(f)
+            if is_complete(row)
+        }
+
+
+def drop_unfinished_line(path: str):
+    """
+    Cut off a last line left without its line break by an interrupted run, so
+    that it is neither taken as done nor merged with the next row appended
+    """
+    if not exists(path):
+        return
+    with open(path, "rb+") as f:
+        data = f.read()
+        if len(data) > 0 and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="Run every combination of heuristic rules over a set of "
+        "instances, appending one CSV row per run and skipping runs already "
+        "present in the output file"
+    )
+    parser.add_argument(
+        "instances",
+        nargs="+",
+        help="instance prefixes, or dynamic:<machines>:<jobs>:<utilization>",
+    )
+    parser.add_argument("--routing", nargs="+", default=list(ROUTING_RULES))
+    parser.add_argument("--sequencing", nargs="+", default=list(SEQUENCING_RULES))
+    parser.add_argument(
+        "--seeds", nargs="+", default=["1"], help="replications of dynamic problems"
+    )
+    parser.add_argument("--output", default="benchmark.csv")
+    parser.add_argument("--parallel", type=int, default=12)
+    args = parser.parse_args()
+
+    grid = make_grid(args.routing, args.sequencing, args.instances, args.seeds)
+    drop_unfinished_line(args.output)
+    done = completed_cells(args.output)
+    todo = [cell for cell in grid if cell not in done]
+    print(f"{len(grid)} runs, {len(grid) - len(todo)} already done")
+
+    write_header = not exists(args.output) or getsize(args.output) == 0
+    with (
+        open(args.output, "a", newline="") as f,
+        ProcessPoolExecutor(args.parallel) as executor,
+    ):
+        writer = DictWriter(f, COLUMNS)
+        if write_header:
+            writer.writeheader()
+        futures = [executor.submit(run_cell, cell) for cell in todo]
+        for i, future in enumerate(as_completed(futures), 1):
+            row = future.result()
+            writer.writerow(row)
+            f.flush()
+            print(
+                f"[{i}/{len(todo)}]",
+                row["routing"],
+                row["sequencing"],
+                row["instance"],
+                row["seed"],
+                row["normalized_makespan"],
+            )
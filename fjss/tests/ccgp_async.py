@@ -0,0 +1,21 @@
+from sys import argv
+from fjss.gp.ccgp import CCGP
+from fjss.problem import StaticFJSSSet
+
+
+problemset = StaticFJSSSet(argv[1])
+ccgp = CCGP()
+
+for i, (routing_rule, sequencing_rule) in zip(
+    range(1, 52), ccgp.run_static_async(problemset)
+):
+    # serially, next to the workers of the async run
+    print(
+        i,
+        ccgp.normalized_makespan(routing_rule, sequencing_rule, problemset, parallel=1),
+    )
+    print(routing_rule)
+    print(sequencing_rule)
+    print(ccgp.stats)
+
+ccgp.close_evaluation_pool()
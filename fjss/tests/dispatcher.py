@@ -0,0 +1,119 @@
+from argparse import ArgumentParser
+from heapq import heappop, heappush
+from random import Random
+from statistics import quantiles
+from time import perf_counter_ns
+from fjss.gp.ccgp import CCGP
+from fjss.gp.program import Program, parse_node
+from fjss.problem import Job, Operation, StaticFJSS, Time, load_problem
+from fjss.simulate.dispatcher import Decision, Dispatcher
+
+
+def replay(
+    dispatcher: Dispatcher, problem: StaticFJSS
+) -> tuple[Time, dict[str, list[int]]]:
+    """
+    Feed the dispatcher the events of a shop processing the problem's jobs
+    with their nominal processing times, as fast as it answers, returning the
+    makespan and the latencies in nanoseconds of every kind of event
+    """
+    latencies: dict[str, list[int]] = {"job_arrived": [], "operation_finished": []}
+    # (time, counter, machine or -1 for an arrival, job index)
+    events: list[tuple[Time, int, int, int]] = []
+    for i, job in enumerate(problem.jobs):
+        heappush(events, (job.arrival_time, len(events), -1, i))
+    counter = len(events)
+    jobs = {job.name: job for job in problem.jobs}
+    now = Time(0)
+
+    while len(events) > 0:
+        now, _, machine, i = heappop(events)
+        start = perf_counter_ns()
+        if machine < 0:
+            decisions = dispatcher.job_arrived(now, problem.jobs[i])
+            latencies["job_arrived"].append(perf_counter_ns() - start)
+        else:
+            decisions = dispatcher.operation_finished(now, machine)
+            latencies["operation_finished"].append(perf_counter_ns() - start)
+        for decision in decisions:
+            if decision.kind == "start":
+                counter += 1
+                event = (finish_time(decision, jobs), counter, decision.machine, 0)
+                heappush(events, event)
+    return now, latencies
+
+
+def perturb(problem: StaticFJSS, seed: str) -> StaticFJSS:
+    """
+    A copy of the problem with every processing time changed by a tiny random
+    amount, so that no two events coincide. The simulation counts a machine
+    as free from its finish time on, even before handling its finish event,
+    while the dispatcher waits to be told; only without ties do they agree.
+    """
+    rng = Random(seed)
+    jobs = [
+        Job(
+            job.name,
+            job.arrival_time,
+            [
+                Operation(
+                    op.name,
+                    {
+                        machine: time * (1 + rng.uniform(0, 1e-6))
+                        for machine, time in op.processing_times.items()
+                    },
+                )
+                for op in job.operations
+            ],
+        )
+        for job in problem.jobs
+    ]
+    return StaticFJSS(problem.name, problem.num_machines, jobs)
+
+
+def finish_time(decision: Decision, jobs: dict[str, Job]) -> Time:
+    op = jobs[decision.job].operations[decision.op_index]
+    return decision.time + op.get_processing_time(decision.machine)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="Measure the per-event latency of an online dispatcher "
+        "driven by the events of a whole instance"
+    )
+    parser.add_argument(
+        "instance",
+        help="instance path, or dynamic:<machines>:<jobs>:<utilization>",
+    )
+    parser.add_argument("--routing", default="ADD(PT,MUL(NIQ,PT))")
+    parser.add_argument("--sequencing", default="ADD(PT,SUB(WKR,OWT))")
+    parser.add_argument("--seed", default="1")
+    args = parser.parse_args()
+
+    problem = perturb(load_problem(args.instance, args.seed), args.seed)
+    routing_rule = Program(parse_node(args.routing))
+    sequencing_rule = Program(parse_node(args.sequencing))
+    ccgp = CCGP()
+    dispatcher = ccgp.make_dispatcher(
+        routing_rule, sequencing_rule, problem.num_machines
+    )
+
+    start = perf_counter_ns()
+    makespan, latencies = replay(dispatcher, problem)
+    seconds = (perf_counter_ns() - start) / 1e9
+    num_events = sum(len(values) for values in latencies.values())
+    # with nominal processing times the dispatcher must decide as in training
+    expected = ccgp.makespan(routing_rule, sequencing_rule, problem)
+    assert makespan == expected, (makespan, expected)
+    print(
+        f"{problem.name}: makespan {makespan}, "
+        f"{num_events} events, {num_events / seconds:.0f} events/s"
+    )
+    for kind, values in latencies.items():
+        if len(values) < 2:
+            continue
+        percentiles = quantiles(values, n=100, method="inclusive")
+        print(
+            f"{kind}: p50 {percentiles[49] / 1e3:.1f} us, "
+            f"p99 {percentiles[98] / 1e3:.1f} us, max {max(values) / 1e3:.1f} us"
+        )
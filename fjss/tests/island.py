@@ -0,0 +1,15 @@
+from sys import argv
+from fjss.gp.island import IslandModel
+from fjss.problem import StaticFJSSSet
+
+
+problemset = StaticFJSSSet(argv[1])
+model = IslandModel(num_islands=int(argv[2]) if len(argv) > 2 else 4)
+
+for i, (routing_rule, sequencing_rule) in zip(
+    range(1, 52), model.run_static(problemset)
+):
+    assert model.best is not None
+    print(i, model.best[2])
+    print(routing_rule)
+    print(sequencing_rule)
@@ -0,0 +1,154 @@
+from argparse import ArgumentParser
+from collections import Counter
+from collections.abc import Callable
+from sys import getsizeof
+from time import perf_counter
+import tracemalloc
+from fjss.gp.ccgp import CCGP
+from fjss.gp.program import Node, Program, parse_node
+from fjss.problem import (
+    DynamicFJSS,
+    Job,
+    Operation,
+    StaticFJSS,
+    StaticFJSSSet,
+    load_problem,
+)
+from fjss.simulate.event import MachineFinishEvent, NewJobEvent
+from fjss.simulate.simulation import MachineQueueItem
+
+# classes whose constructions are counted during a simulation
+PER_OPERATION_CLASSES = [MachineQueueItem, MachineFinishEvent]
+
+
+def footprint(make: Callable[[], object], n: int = 10000) -> float:
+    """
+    Traced memory per object of n objects built by make
+    """
+    tracemalloc.start()
+    objects = [make() for _ in range(n)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (size - getsizeof(objects)) / n
+
+
+def copy_problem(problem: StaticFJSS) -> StaticFJSS:
+    jobs = [
+        Job(
+            job.name,
+            job.arrival_time,
+            [Operation(op.name, op.processing_times) for op in job.operations],
+        )
+        for job in problem.jobs
+    ]
+    return StaticFJSS(problem.name, problem.num_machines, jobs)
+
+
+def count_constructions(counts: Counter[str]):
+    for cls in PER_OPERATION_CLASSES:
+        init = cls.__init__
+
+        def counting_init(self, *args, init=init, name=cls.__name__):
+            counts[name] += 1
+            init(self, *args)
+
+        cls.__init__ = counting_init
+
+
+def measure(
+    ccgp: CCGP,
+    routing_rule: Program,
+    sequencing_rule: Program,
+    problem: StaticFJSS,
+    recycle: bool,
+    counts: Counter[str],
+) -> tuple[int, float]:
+    """
+    Peak traced memory of a simulation in bytes, and its duration in seconds
+    without tracing. Constructions are counted during the traced run only.
+    """
+    sim = ccgp.make_simulation(routing_rule, sequencing_rule, problem)
+    sim.recycle = recycle
+    start = perf_counter()
+    sim.simulate()
+    seconds = perf_counter() - start
+
+    tracemalloc.start()
+    sim = ccgp.make_simulation(routing_rule, sequencing_rule, problem)
+    sim.recycle = recycle
+    counts.clear()
+    sim.simulate()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, seconds
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="Report the memory used by the object model and by "
+        "simulations of the largest instances"
+    )
+    parser.add_argument(
+        "instances",
+        nargs="+",
+        help="instance prefixes, or dynamic:<machines>:<jobs>:<utilization>",
+    )
+    parser.add_argument("--largest", type=int, default=3)
+    parser.add_argument("--routing", default="ADD(PT,MUL(NIQ,PT))")
+    parser.add_argument("--sequencing", default="ADD(PT,SUB(WKR,OWT))")
+    args = parser.parse_args()
+
+    problems: list[StaticFJSS] = []
+    for instance in args.instances:
+        if DynamicFJSS.is_spec(instance):
+            problems.append(load_problem(instance, "1"))
+        else:
+            problems.extend(StaticFJSSSet(instance))
+    problems.sort(key=lambda p: -sum(len(job.operations) for job in p.jobs))
+    problems = problems[: args.largest]
+
+    job = problems[0].jobs[0]
+    op = job.operations[0]
+    print("bytes per object:")
+    for name, make in [
+        ("Operation", lambda: Operation(op.name, op.processing_times)),
+        ("Job", lambda: Job(job.name, job.arrival_time, job.operations)),
+        ("MachineQueueItem", lambda: MachineQueueItem(job, 0)),
+        ("NewJobEvent", lambda: NewJobEvent(job)),
+        ("MachineFinishEvent", lambda: MachineFinishEvent(0.0, 0, job, 0)),
+        ("Node", lambda: Node("PT", [])),
+    ]:
+        print(f"  {name}: {footprint(make):.0f}")
+
+    ccgp = CCGP()
+    population = ccgp.init_population()
+    num_nodes = sum(len(p.root.descendants()) for p in population)
+    tracemalloc.start()
+    copies = [p.copy() for p in population]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"population copy: {size / num_nodes:.1f} bytes per node")
+    del copies
+
+    routing_rule = Program(parse_node(args.routing))
+    sequencing_rule = Program(parse_node(args.sequencing))
+    counts: Counter[str] = Counter()
+    count_constructions(counts)
+    for problem in problems:
+        num_ops = sum(len(job.operations) for job in problem.jobs)
+        instance_size = footprint(lambda: copy_problem(problem), 1)
+        print(
+            f"{problem.name}: {num_ops} operations, "
+            f"instance {instance_size / num_ops:.0f} bytes/operation"
+        )
+        for recycle in [False, True]:
+            peak, seconds = measure(
+                ccgp, routing_rule, sequencing_rule, problem, recycle, counts
+            )
+            allocations = sum(counts.values()) / num_ops
+            print(
+                f"  {'free lists' if recycle else 'no reuse  '}: "
+                f"peak {peak / 1024:.0f} KiB, "
+                f"{allocations:.2f} items+events allocated/operation, "
+                f"{seconds * 1e3:.1f} ms"
+            )
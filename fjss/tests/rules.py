@@ -0,0 +1,52 @@
+from statistics import mean
+from sys import argv
+from time import perf_counter
+from fjss.problem import Job, Operation, StaticFJSS, StaticFJSSSet, Time
+from fjss.simulate.heuristics import (
+    ROUTING_RULES,
+    SEQUENCING_RULES,
+    MWKRMachineQueue,
+    routing_rule_lwq,
+    work_remaining,
+)
+from fjss.simulate.simulation import MachineQueueItem, Simulation
+
+
+def check_mwkr():
+    """
+    MWKR starts the operation with the most work left in its job: the first
+    operation of a job before its last one
+    """
+    job = Job(
+        "1",
+        Time(0),
+        [Operation(f"1:{i + 1}", {0: Time(t)}) for i, t in enumerate([10, 1, 100])],
+    )
+    problem = StaticFJSS("mwkr", 1, [job])
+    sim = Simulation(problem, SEQUENCING_RULES["FIFO"], routing_rule_lwq)
+    items = [MachineQueueItem(job, op_index) for op_index in range(3)]
+    assert [work_remaining(item) for item in items] == [111, 101, 100]
+    queue = MWKRMachineQueue(sim, 0)
+    for item in reversed(items):
+        queue.push(item)
+    assert [queue.pop() for _ in items] == items
+
+
+if __name__ == "__main__":
+    check_mwkr()
+    problemset = StaticFJSSSet(argv[1])
+    print("routing", "sequencing", "normalized_makespan", "seconds")
+    for routing_name, routing_rule in ROUTING_RULES.items():
+        for sequencing_name, sequencing_rule in SEQUENCING_RULES.items():
+            start = perf_counter()
+            normalized_makespan = mean(
+                Simulation(problem, sequencing_rule, routing_rule).simulate()
+                / (problem.lower_bound or float("nan"))
+                for problem in problemset
+            )
+            print(
+                routing_name,
+                sequencing_name,
+                normalized_makespan,
+                perf_counter() - start,
+            )